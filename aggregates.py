@@ -0,0 +1,276 @@
+"""
+Aggregati incrementali per ruolo e categoria, aggiornati a ogni riga salvata.
+
+Per ogni (ruolo, categoria) teniamo:
+  - RunningStats: count, media e varianza con l'algoritmo di Welford
+  - QuantileSketch: sketch a bucket logaritmici (stile DDSketch), unibile tra
+    processi, per una mediana robusta agli outlier
+
+Così il confronto "vs average", il percentile e l'istogramma dei pari sono
+letture sugli sketch invece di un ricalcolo sull'intero foglio.
+"""
+import bisect
+import json
+import math
+import os
+import sys
+import threading
+
+
+CATEGORIES = ["CO2 Devices", "CO2 E-Waste", "CO2 AI", "CO2 Digital Activities", "CO2 Total"]
+
+
+class RunningStats:
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, min=None, max=None):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min
+        self.max = max
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.min = x if self.min is None else min(self.min, x)
+        self.max = x if self.max is None else max(self.max, x)
+
+    def merge(self, other: "RunningStats"):
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2, self.min, self.max = other.count, other.mean, other.m2, other.min, other.max
+            return
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def to_list(self):
+        return [self.count, self.mean, self.m2, self.min, self.max]
+
+    @classmethod
+    def from_list(cls, data):
+        return cls(*data)
+
+
+class QuantileSketch:
+    """Quantili con errore relativo <= alpha; gestisce anche valori negativi (E-Waste)."""
+
+    def __init__(self, alpha: float = 0.01, min_value: float = 1e-6):
+        self.alpha = alpha
+        self.min_value = min_value
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self._gamma)
+        self.pos = {}
+        self.neg = {}
+        self.zero = 0
+        self.count = 0
+
+    def _key(self, x: float) -> int:
+        return math.ceil(math.log(x) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def add(self, x: float):
+        self.count += 1
+        if x > self.min_value:
+            k = self._key(x)
+            self.pos[k] = self.pos.get(k, 0) + 1
+        elif x < -self.min_value:
+            k = self._key(-x)
+            self.neg[k] = self.neg.get(k, 0) + 1
+        else:
+            self.zero += 1
+
+    def merge(self, other: "QuantileSketch"):
+        if other.alpha != self.alpha:
+            raise ValueError("cannot merge sketches with different accuracy")
+        for k, c in other.pos.items():
+            self.pos[k] = self.pos.get(k, 0) + c
+        for k, c in other.neg.items():
+            self.neg[k] = self.neg.get(k, 0) + c
+        self.zero += other.zero
+        self.count += other.count
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        # dal più negativo al più positivo
+        for k in sorted(self.neg, reverse=True):
+            seen += self.neg[k]
+            if seen > rank:
+                return -self._value(k)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for k in sorted(self.pos):
+            seen += self.pos[k]
+            if seen > rank:
+                return self._value(k)
+        return self._value(max(self.pos)) if self.pos else 0.0
+
+    def rank(self, x: float) -> float:
+        """Frazione di valori sotto x (metà del bucket di x conta come "sotto")."""
+        if not self.count:
+            return 0.0
+        below = 0.0
+        if x > self.min_value:
+            k = self._key(x)
+            below += sum(self.neg.values()) + self.zero
+            below += sum(c for key, c in self.pos.items() if key < k) + self.pos.get(k, 0) / 2
+        elif x < -self.min_value:
+            k = self._key(-x)
+            below += sum(c for key, c in self.neg.items() if key > k) + self.neg.get(k, 0) / 2
+        else:
+            below += sum(self.neg.values()) + self.zero / 2
+        return below / self.count
+
+    def histogram(self, edges: list[float]) -> list[int]:
+        """Ri-bin dei bucket dello sketch su bin lineari (fuori range -> primo/ultimo bin)."""
+        counts = [0] * (len(edges) - 1)
+        last = len(counts) - 1
+        items = [(-self._value(k), c) for k, c in self.neg.items()]
+        items += [(0.0, self.zero)] if self.zero else []
+        items += [(self._value(k), c) for k, c in self.pos.items()]
+        for v, c in items:
+            i = bisect.bisect_right(edges, v) - 1
+            counts[min(max(i, 0), last)] += c
+        return counts
+
+    def to_dict(self):
+        # copie: il dict può essere serializzato dopo aver rilasciato il lock
+        return {"alpha": self.alpha, "pos": dict(self.pos), "neg": dict(self.neg), "zero": self.zero, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, data):
+        s = cls(alpha=data["alpha"])
+        s.pos = {int(k): c for k, c in data["pos"].items()}
+        s.neg = {int(k): c for k, c in data["neg"].items()}
+        s.zero = data["zero"]
+        s.count = data["count"]
+        return s
+
+
+class RoleAggregates:
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._groups = {}   # (role, category) -> (RunningStats, QuantileSketch)
+        if path and os.path.exists(path):
+            self._load()
+
+    def _group(self, role: str, category: str):
+        g = self._groups.get((role, category))
+        if g is None:
+            g = self._groups[(role, category)] = (RunningStats(), QuantileSketch())
+        return g
+
+    def add_row(self, row: dict):
+        role = str(row.get("Role") or "").strip()
+        if not role:
+            return
+        with self._lock:
+            for cat in CATEGORIES:
+                try:
+                    x = float(row.get(cat))
+                except (TypeError, ValueError):
+                    continue
+                stats, sketch = self._group(role, cat)
+                stats.add(x)
+                sketch.add(x)
+
+    def add_rows(self, rows):
+        for row in rows:
+            self.add_row(row)
+        if self.path:
+            self.save()
+
+    def merge(self, other: "RoleAggregates"):
+        with self._lock:
+            for key, (stats, sketch) in other._groups.items():
+                mine = self._group(*key)
+                mine[0].merge(stats)
+                mine[1].merge(sketch)
+
+    def summary(self, role: str, category: str = "CO2 Total") -> dict:
+        """count, mean, std, median (e min/max) per ruolo e categoria."""
+        with self._lock:
+            g = self._groups.get(((role or "").strip(), category))
+            if g is None:
+                return {"count": 0, "mean": None, "std": None, "median": None, "min": None, "max": None}
+            stats, sketch = g
+            return {
+                "count": stats.count,
+                "mean": stats.mean,
+                "std": math.sqrt(stats.variance),
+                "median": sketch.quantile(0.5),
+                "min": stats.min,
+                "max": stats.max,
+            }
+
+    def percentile(self, role: str, category: str, value: float) -> tuple[float | None, int]:
+        """(percentile 0-100 di `value` tra i pari ruolo, numero di risposte)."""
+        with self._lock:
+            g = self._groups.get(((role or "").strip(), category))
+            if g is None or not g[1].count:
+                return None, 0
+            return 100.0 * g[1].rank(value), g[1].count
+
+    def histogram(self, role: str, category: str, bins: int = 20) -> tuple[list[float], list[int]]:
+        """(edges, counts) della distribuzione dei pari, tagliata tra 1° e 99° percentile."""
+        with self._lock:
+            g = self._groups.get(((role or "").strip(), category))
+            if g is None or not g[1].count:
+                return [], []
+            sketch = g[1]
+            lo, hi = sketch.quantile(0.01), sketch.quantile(0.99)
+            if hi <= lo:
+                hi = lo + 1.0
+            step = (hi - lo) / bins
+            edges = [lo + i * step for i in range(bins + 1)]
+            return edges, sketch.histogram(edges)
+
+    # --- persistenza (snapshot JSON, scritto in modo atomico)
+
+    def save(self):
+        # snapshot completo sotto lock (sketch copiati), serializzato fuori
+        with self._lock:
+            data = {
+                "version": 1,
+                "groups": [
+                    {"role": r, "category": c, "stats": s.to_list(), "sketch": q.to_dict()}
+                    for (r, c), (s, q) in self._groups.items()
+                ],
+            }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def _load(self):
+        # un file corrotto o troncato non deve bloccare role_aggregates(): si riparte vuoti
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            groups = {
+                (g["role"], g["category"]): (RunningStats.from_list(g["stats"]), QuantileSketch.from_dict(g["sketch"]))
+                for g in data.get("groups", [])
+            }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"[aggregates] cannot load {self.path}, starting empty: {e!r}", file=sys.stderr)
+            return
+        self._groups = groups
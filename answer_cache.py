@@ -0,0 +1,126 @@
+"""
+Cache condivisa (tra tutte le sessioni del processo) delle valutazioni per
+combinazione di risposte.
+
+Quasi tutte le domande sono a fasce (email, cloud, slider a mezz'ora, poche
+combinazioni di device/condizione/fine vita): molti studenti dello stesso
+corso danno risposte identiche. La chiave è il vettore canonico delle
+risposte (schema.encode_answers con device, attività e task AI ordinati, più
+la versione dei fattori); il valore è footprint, consigli personalizzati,
+virtù e azioni ordinate per risparmio (sensitivity.py). Il nome non entra nella chiave: la scelta casuale dei consigli
+generici per utente resta in results.build_bundle.
+
+Action.device è una posizione in Answers.devices, che dipende dall'ordine di
+inserimento: in cache le azioni sono salvate con le posizioni nell'ordine
+canonico della chiave e riportate all'ordine di chi legge a ogni lookup.
+
+LRU limitata a `maxsize` voci, con hit rate ed evictions in `stats()` per
+dimensionarla (ANSWER_CACHE_SIZE).
+"""
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+
+import schema
+import sensitivity
+import tips
+from engine import Answers, Footprint, compute_footprint
+from factors import FactorSet
+
+
+@dataclass(frozen=True)
+class Evaluation:
+    footprint: Footprint | None
+    personalized: MappingProxyType     # categoria -> (tip, ...)
+    virtues: tuple
+    actions: tuple                     # sensitivity.Action, dal risparmio maggiore
+
+
+def answer_key(answers: Answers, fs: FactorSet) -> str:
+    """Vettore canonico: l'ordine in cui sono stati inseriti device e attività non conta."""
+    code = schema.encode_answers(answers)
+    for k in ("dev", "act", "ai"):
+        code[k] = sorted(code[k])
+    code["factors"] = fs.version
+    return json.dumps(code, sort_keys=True, separators=(",", ":"))
+
+
+def _device_order(answers: Answers) -> list[int]:
+    """Posizioni in answers.devices nell'ordine canonico di answer_key (i device uguali sono intercambiabili)."""
+    dev = schema.encode_answers(answers)["dev"]
+    return sorted(range(len(dev)), key=dev.__getitem__)
+
+
+def _remap(value: Evaluation, positions: list[int]) -> Evaluation:
+    """Le stesse azioni con Action.device tradotto attraverso `positions`."""
+    actions = tuple(
+        replace(a, device=positions[a.device]) if a.device >= 0 else a
+        for a in value.actions
+    )
+    return replace(value, actions=actions)
+
+
+def evaluate(answers: Answers, fs: FactorSet) -> Evaluation:
+    """Footprint, consigli, virtù e azioni di un insieme di risposte (senza cache)."""
+    personalized, virtues = tips.evaluate(answers, fs)
+    return Evaluation(
+        footprint=compute_footprint(answers, fs),
+        personalized=MappingProxyType({cat: tuple(t) for cat, t in personalized.items()}),
+        virtues=tuple(virtues),
+        actions=tuple(sensitivity.ranked_actions(answers, fs)),
+    )
+
+
+class AnswerCache:
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def evaluate(self, answers: Answers, fs: FactorSet) -> Evaluation:
+        key = answer_key(answers, fs)
+        with self._lock:
+            found = self._entries.get(key)
+            if found is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        order = _device_order(answers)
+        if found is not None:
+            return _remap(found, order)
+
+        # calcolo fuori dal lock: due sessioni con la stessa chiave al più lo rifanno entrambe
+        value = evaluate(answers, fs)
+        canonical = [0] * len(order)
+        for rank, pos in enumerate(order):
+            canonical[pos] = rank
+        with self._lock:
+            self._entries[key] = _remap(value, canonical)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+            }
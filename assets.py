@@ -0,0 +1,85 @@
+"""
+Immagini ridimensionate alla dimensione di visualizzazione e tenute in memoria.
+
+Gli originali PNG pesano ~1.8 MB ma vengono mostrati a 180-300 px: qui
+generiamo una variante WebP (2x per gli schermi HiDPI) una sola volta per
+processo e la passiamo a `st.image` come bytes. Teniamo anche il conto dei
+byte serviti per pagina.
+
+    python assets.py    # stampa dimensione originale vs variante
+"""
+import io
+import os
+import threading
+
+from PIL import Image
+
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+HIDPI_SCALE = 2
+
+# (file, larghezza di visualizzazione in px) usati dalle pagine
+DISPLAY_SIZES = [
+    ("logo.png", 300),
+    ("logo2.png", 300),
+    ("lord_of_the_latest_gadgets.png", 290),
+    ("prompt_pirate.png", 290),
+    ("guardian_ewaste.png", 290),
+    ("master_endless_streams.png", 290),
+    ("lord_of_the_latest_gadgets.png", 180),
+    ("prompt_pirate.png", 180),
+    ("guardian_ewaste.png", 180),
+    ("master_endless_streams.png", 180),
+]
+
+_lock = threading.Lock()
+_variants = {}          # (file, width, fmt) -> bytes
+_served = {}            # page -> {"images": n, "bytes": n}
+
+
+def _render(name: str, width: int, fmt: str) -> bytes:
+    with Image.open(os.path.join(ASSET_DIR, name)) as img:
+        target = width * HIDPI_SCALE
+        if img.width > target:
+            img = img.resize((target, round(img.height * target / img.width)), Image.LANCZOS)
+        buf = io.BytesIO()
+        if fmt == "WEBP":
+            img.save(buf, format="WEBP", quality=85, method=4)
+        else:
+            img.save(buf, format="PNG", optimize=True)
+        return buf.getvalue()
+
+
+def image_bytes(name: str, width: int, fmt: str = "WEBP") -> bytes:
+    key = (name, width, fmt)
+    data = _variants.get(key)
+    if data is None:
+        data = _render(name, width, fmt)
+        with _lock:
+            data = _variants.setdefault(key, data)
+    return data
+
+
+def warm(sizes=DISPLAY_SIZES):
+    """Genera tutte le varianti (chiamato una volta all'avvio)."""
+    for name, width in sizes:
+        image_bytes(name, width)
+
+
+def record_served(page: str, nbytes: int):
+    with _lock:
+        s = _served.setdefault(page, {"images": 0, "bytes": 0})
+        s["images"] += 1
+        s["bytes"] += nbytes
+
+
+def served_stats() -> dict:
+    with _lock:
+        return {page: dict(s) for page, s in _served.items()}
+
+
+if __name__ == "__main__":
+    for name, width in DISPLAY_SIZES:
+        orig = os.path.getsize(os.path.join(ASSET_DIR, name))
+        var = len(image_bytes(name, width))
+        print(f"{name:34} @{width:3}px  {orig / 1024:8.1f} KB -> {var / 1024:6.1f} KB")
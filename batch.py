@@ -0,0 +1,270 @@
+"""
+Scoring vettoriale di molte risposte in un colpo solo (NumPy/pandas).
+
+Input in formato "long":
+  - respondents: una riga per rispondente
+      respondent, role, email_plain, email_attach, cloud, wifi_hours, pages, idle
+  - devices: una riga per device
+      respondent, device, used, shared, years, eol
+  - items: una riga per attività o task AI
+      respondent, kind (ITEM_ACTIVITY | ITEM_AI), item, amount (h/giorno o query/giorno)
+
+Le colonne categoriali contengono i codici interi di `schema` (int8), così i
+frame restano compatti e filtri e lookup sono confronti/indicizzazioni su
+interi. Sono accettate anche colonne con le etichette, che vengono codificate.
+
+`score_batch()` restituisce un DataFrame indicizzato per respondent con le
+stesse categorie di `engine.Footprint.as_results()` più "Total".
+Le formule sono le stesse di engine.compute_footprint(), applicate ad array.
+"""
+import numpy as np
+import pandas as pd
+
+import engine
+import factors
+import schema
+from engine import Answers
+from factors import FactorSet
+
+
+RESPONDENT_COLUMNS = ["respondent", "role", "email_plain", "email_attach", "cloud", "wifi_hours", "pages", "idle"]
+DEVICE_COLUMNS = ["respondent", "device", "used", "shared", "years", "eol"]
+ITEM_COLUMNS = ["respondent", "kind", "item", "amount"]
+
+ITEM_ACTIVITY = 0
+ITEM_AI = 1
+
+CATEGORIES = ["Devices", "E-Waste", "Digital Activities", "AI Tools"]
+
+
+def _codes(values, book: schema.Codebook) -> np.ndarray:
+    """Codici della colonna: già interi, oppure etichette da codificare."""
+    if pd.api.types.is_integer_dtype(values):
+        return values.to_numpy()
+    return book.codes(values)
+
+
+def _respondent_index(respondents: pd.DataFrame, ids) -> np.ndarray:
+    idx = pd.Index(respondents["respondent"]).get_indexer(ids)
+    if (idx < 0).any():
+        raise ValueError("rows reference respondents missing from the respondents frame")
+    return idx
+
+
+def device_scores(devices: pd.DataFrame, fs: FactorSet | None = None) -> pd.DataFrame:
+    """Produzione ed e-waste annui per ogni riga device (stesso ordine dell'input)."""
+    fs = fs or factors.current()
+    years = devices["years"].to_numpy(dtype=np.float64)
+    adj = years * fs.adj_arr[_codes(devices["used"], schema.CONDITION), _codes(devices["shared"], schema.OWNERSHIP)]
+    adj = np.where(years > 0, adj, 0.0)
+
+    impact = fs.device_arr[_codes(devices["device"], schema.DEVICE)]
+    eol_mod = fs.eol_arr[_codes(devices["eol"], schema.EOL)]
+    ok = adj != 0
+    safe = np.where(ok, adj, 1.0)
+    return pd.DataFrame({
+        "adj_years": adj,
+        "production": np.where(ok, impact / safe, 0.0),
+        "eol": np.where(ok, (impact * eol_mod) / safe, 0.0),
+    }, index=devices.index)
+
+
+def score_batch(respondents: pd.DataFrame, devices: pd.DataFrame, items: pd.DataFrame,
+                fs: FactorSet | None = None) -> pd.DataFrame:
+    fs = fs or factors.current()
+    n = len(respondents)
+    days, ef = fs.days, fs.ef
+
+    # --- Devices / E-Waste
+    dev = device_scores(devices, fs)
+    dev_idx = _respondent_index(respondents, devices["respondent"])
+    co2_devices = np.bincount(dev_idx, weights=dev["production"].to_numpy(), minlength=n)
+    co2_ewaste = np.bincount(dev_idx, weights=dev["eol"].to_numpy(), minlength=n)
+
+    # --- Attività e AI (stesso frame, distinti da "kind")
+    item_idx = _respondent_index(respondents, items["respondent"])
+    amount = items["amount"].to_numpy(dtype=np.float64)
+    kind = items["kind"]
+    is_ai = (kind == ITEM_AI if pd.api.types.is_integer_dtype(kind) else kind == "ai").to_numpy()
+
+    # gli item sono codici di ACTIVITY o di AI_TASK a seconda di "kind"
+    if pd.api.types.is_integer_dtype(items["item"]):
+        item = items["item"].to_numpy()
+    else:
+        item = np.where(is_ai, schema.AI_TASK.codes(items["item"]), schema.ACTIVITY.codes(items["item"]))
+    role_codes = _codes(respondents["role"], schema.ROLE)[item_idx]
+    act_ef = fs.activity_arr[role_codes, np.where(is_ai, schema.MISSING, item)]
+    ai_ef = fs.ai_arr[np.where(is_ai, item, schema.MISSING)]
+
+    hours_total = np.bincount(item_idx, weights=np.where(is_ai, 0.0, amount * act_ef * days), minlength=n)
+    co2_ai = np.bincount(item_idx, weights=np.where(is_ai, amount * ai_ef * days, 0.0), minlength=n)
+
+    # --- Email, cloud, wi-fi, stampa, standby (una riga per rispondente)
+    em_plain = fs.email_arr[_codes(respondents["email_plain"], schema.EMAIL_BUCKET)]
+    em_attach = fs.email_arr[_codes(respondents["email_attach"], schema.EMAIL_BUCKET)]
+    cld = fs.cloud_arr[_codes(respondents["cloud"], schema.CLOUD_BUCKET)]
+    mail_total = (em_plain * ef["email_plain"] + em_attach * ef["email_attach"] + cld * ef["cloud_gb"]) * days
+    wifi_total = respondents["wifi_hours"].to_numpy(dtype=np.float64) * ef["wifi_hour"] * days
+    pages = respondents["pages"].fillna(0).to_numpy(dtype=np.int64)
+    print_total = pages * ef["print_page"] * (days / 5)
+    idle = _codes(respondents["idle"], schema.IDLE)
+    idle_total = np.select(
+        [idle == schema.IDLE.code(engine.IDLE_ON), idle == schema.IDLE.code(engine.IDLE_OFF)],
+        [days * ef["idle_on"] * fs.idle_hours, days * ef["idle_off"] * fs.idle_hours],
+        default=0.0,
+    )
+    co2_digital = hours_total + mail_total + wifi_total + print_total + idle_total
+
+    out = pd.DataFrame({
+        "Devices": co2_devices,
+        "E-Waste": co2_ewaste,
+        "Digital Activities": co2_digital,
+        "AI Tools": co2_ai,
+    }, index=pd.Index(respondents["respondent"], name="respondent"))
+    out["Total"] = out[CATEGORIES].sum(axis=1)
+    return out
+
+
+def answers_to_frames(answers_by_id: dict) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Converte {respondent: Answers} nei tre frame long (codificati) attesi da score_batch()."""
+    return encoded_to_frames({rid: schema.encode_answers(a) for rid, a in answers_by_id.items()})
+
+
+def encoded_to_frames(encoded_by_id: dict) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Come answers_to_frames(), ma da risposte già in forma compatta (schema.encode_answers)."""
+    resp, devs, items = [], [], []
+    for rid, e in encoded_by_id.items():
+        if e.get("v") != schema.SCHEMA_VERSION:
+            raise ValueError(f"unsupported schema version: {e.get('v')!r}")
+        resp.append((rid, e["role"], *e["mail"], e["wifi"], e["pages"], e["idle"]))
+        for kind, used, shared, years, eol in e["dev"]:
+            devs.append((rid, kind, used, shared, years, eol))
+        for act, hours in e["act"]:
+            items.append((rid, ITEM_ACTIVITY, act, hours))
+        for task, q in e["ai"]:
+            items.append((rid, ITEM_AI, task, q))
+    return (
+        _with_codes(pd.DataFrame(resp, columns=RESPONDENT_COLUMNS), ["role", "email_plain", "email_attach", "cloud", "idle"]),
+        _with_codes(pd.DataFrame(devs, columns=DEVICE_COLUMNS), ["device", "used", "shared", "eol"]),
+        _with_codes(pd.DataFrame(items, columns=ITEM_COLUMNS), ["kind", "item"]),
+    )
+
+
+def frame_columns(respondents: pd.DataFrame, devices: pd.DataFrame, items: pd.DataFrame) -> tuple[dict, dict, dict]:
+    """
+    Colonne numpy dei tre frame (codificati). Device e item hanno anche "pos",
+    la posizione del rispondente in `respondents`, pronta per np.bincount.
+    """
+    resp = {c: respondents[c].to_numpy() for c in ("role", "email_plain", "email_attach", "cloud", "idle")}
+    resp["wifi_hours"] = respondents["wifi_hours"].to_numpy(dtype=np.float64)
+    resp["pages"] = respondents["pages"].fillna(0).to_numpy(dtype=np.int64)
+    dev = {c: devices[c].to_numpy() for c in ("device", "used", "shared", "eol")}
+    dev["years"] = devices["years"].fillna(0).to_numpy(dtype=np.float64)
+    dev["pos"] = _respondent_index(respondents, devices["respondent"])
+    it = {c: items[c].to_numpy() for c in ("kind", "item")}
+    it["amount"] = items["amount"].to_numpy(dtype=np.float64)
+    it["pos"] = _respondent_index(respondents, items["respondent"])
+    return resp, dev, it
+
+
+def answer_columns(answers: Answers) -> tuple[dict, dict, dict]:
+    """Come frame_columns() per un solo rispondente, senza costruire i DataFrame."""
+    e = schema.encode_answers(answers)
+    plain, attach, cloud = e["mail"]
+    resp = {
+        "role": np.array([e["role"]]), "email_plain": np.array([plain]), "email_attach": np.array([attach]),
+        "cloud": np.array([cloud]), "idle": np.array([e["idle"]]),
+        "wifi_hours": np.array([e["wifi"]], dtype=np.float64), "pages": np.array([e["pages"]], dtype=np.int64),
+    }
+    rows = np.array([d[:3] + d[4:] for d in e["dev"]], dtype=np.int64).reshape(-1, 4)
+    dev = {
+        "device": rows[:, 0], "used": rows[:, 1], "shared": rows[:, 2], "eol": rows[:, 3],
+        "years": np.array([d[3] for d in e["dev"]], dtype=np.float64), "pos": np.zeros(len(rows), dtype=np.int64),
+    }
+    pairs = [(ITEM_ACTIVITY, c, h) for c, h in e["act"]] + [(ITEM_AI, c, q) for c, q in e["ai"]]
+    it = {
+        "kind": np.array([k for k, _, _ in pairs], dtype=np.int64), "item": np.array([c for _, c, _ in pairs], dtype=np.int64),
+        "amount": np.array([a for _, _, a in pairs], dtype=np.float64), "pos": np.zeros(len(pairs), dtype=np.int64),
+    }
+    return resp, dev, it
+
+
+def _with_codes(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    return df.astype({c: np.int8 for c in columns})
+
+
+def frames_to_labels(respondents, devices, items):
+    """Stessi frame con le etichette al posto dei codici (per export e confronto)."""
+    resp = respondents.copy()
+    for col, book in [("role", schema.ROLE), ("email_plain", schema.EMAIL_BUCKET),
+                      ("email_attach", schema.EMAIL_BUCKET), ("cloud", schema.CLOUD_BUCKET), ("idle", schema.IDLE)]:
+        resp[col] = np.array(book.labels, dtype=object)[resp[col]]
+    dev = devices.copy()
+    for col, book in [("device", schema.DEVICE), ("used", schema.CONDITION), ("shared", schema.OWNERSHIP), ("eol", schema.EOL)]:
+        dev[col] = np.array(book.labels, dtype=object)[dev[col]]
+    it = items.copy()
+    is_ai = (it["kind"] == ITEM_AI).to_numpy()
+    item = it["item"].to_numpy()
+    labels = np.array(schema.ACTIVITY.labels, dtype=object)[np.where(is_ai, schema.MISSING, item)]
+    labels[is_ai] = np.array(schema.AI_TASK.labels, dtype=object)[item[is_ai]]
+    it["item"] = labels
+    it["kind"] = np.where(is_ai, "ai", "activity")
+    return resp, dev, it
+
+
+def _random_answers(rng, n_devices: int) -> Answers:
+    fs = factors.current()
+    role = rng.choice(list(fs.activity_factors))
+    return Answers(
+        role=role,
+        devices=[
+            engine.DeviceAnswer(
+                kind=rng.choice(list(fs.device_ef)),
+                used=rng.choice(["New", "Used"]),
+                shared=rng.choice(["Personal", "Shared with family", "Shared in university"]),
+                years=rng.randint(1, 40) / 2,
+                eol=rng.choice(list(fs.eol_modifier)),
+            )
+            for _ in range(n_devices)
+        ],
+        activity_hours={a: rng.randint(0, 16) / 2 for a in fs.activity_factors[role]},
+        email_plain=rng.choice([engine.SELECT_OPTION, *fs.emails]),
+        email_attach=rng.choice([engine.SELECT_OPTION, *fs.emails]),
+        cloud=rng.choice([engine.SELECT_OPTION, *fs.cloud_gb]),
+        wifi_hours=rng.randint(0, 16) / 2,
+        pages=rng.randint(0, 100),
+        idle=rng.choice([engine.IDLE_ON, engine.IDLE_OFF, schema.IDLE_NO_COMPUTER]),
+        ai_queries={t: rng.choice([0, 5, 10, 20]) for t in fs.ai_factors},
+    )
+
+
+if __name__ == "__main__":
+    # Benchmark: python batch.py [n_respondents]
+    import random
+    import sys
+    import time
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 250_000
+    rng = random.Random(0)
+    sample = {i: _random_answers(rng, 4) for i in range(n)}
+    respondents, devices, items = answers_to_frames(sample)
+
+    t0 = time.perf_counter()
+    scores = score_batch(respondents, devices, items)
+    elapsed = time.perf_counter() - t0
+    print(f"{len(devices):,} device rows, {len(items):,} item rows, {n:,} respondents: {elapsed:.2f}s")
+
+    # confronto con il percorso interattivo su un campione
+    for rid in rng.sample(range(n), min(n, 2000)):
+        expected = engine.compute_footprint(sample[rid]).as_results()
+        for cat in CATEGORIES:
+            assert abs(scores.at[rid, cat] - expected[cat]) < 0.005, (rid, cat)
+    print("sample matches engine.compute_footprint")
+
+    # stessi dati con le etichette: dimensione dei frame e tempo di scoring
+    labelled = frames_to_labels(respondents, devices, items)
+    mb = lambda frames: sum(f.memory_usage(deep=True).sum() for f in frames) / 2**20
+    t0 = time.perf_counter()
+    assert np.allclose(score_batch(*labelled)["Total"], scores["Total"])
+    print(f"labels: {mb(labelled):.1f} MB, scored in {time.perf_counter() - t0:.2f}s")
+    print(f"codes:  {mb((respondents, devices, items)):.1f} MB, scored in {elapsed:.2f}s")
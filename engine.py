@@ -0,0 +1,146 @@
+"""
+Motore di calcolo della Digital Carbon Footprint.
+
+Tutta la matematica delle emissioni vive qui, senza dipendenze da Streamlit:
+le pagine costruiscono un `Answers` dalle risposte dell'utente e leggono
+il `Footprint` restituito da `compute_footprint()`. I fattori arrivano da
+`factors.current()` (factors.json) e ogni Footprint riporta la versione usata.
+"""
+from dataclasses import dataclass, field
+
+import factors
+import schema
+from factors import FactorSet
+# etichette definite in schema, riesportate per le pagine
+from schema import IDLE_OFF, IDLE_ON, SELECT, SELECT_OPTION
+
+
+@dataclass
+class DeviceAnswer:
+    kind: str
+    used: str = SELECT
+    shared: str = SELECT
+    years: float = 1.0
+    eol: str = SELECT
+
+
+@dataclass
+class Answers:
+    role: str
+    devices: list[DeviceAnswer] = field(default_factory=list)
+    activity_hours: dict[str, float] = field(default_factory=dict)
+    email_plain: str = SELECT_OPTION
+    email_attach: str = SELECT_OPTION
+    cloud: str = SELECT_OPTION
+    wifi_hours: float = 4.0
+    pages: int = 0
+    idle: str | None = None
+    ai_queries: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def ai_total_queries(self) -> int:
+        return sum(int(q) for q in self.ai_queries.values())
+
+
+@dataclass(frozen=True)
+class DeviceFootprint:
+    kind: str
+    adj_years: float
+    production: float
+    eol: float
+
+
+@dataclass(frozen=True)
+class Footprint:
+    devices: tuple[DeviceFootprint, ...]
+    activities: float
+    mail: float
+    wifi: float
+    printing: float
+    idle: float
+    ai: float
+    factor_version: int = 0
+
+    @property
+    def devices_total(self) -> float:
+        return sum(d.production for d in self.devices)
+
+    @property
+    def ewaste_total(self) -> float:
+        return sum(d.eol for d in self.devices)
+
+    @property
+    def digital_total(self) -> float:
+        return self.activities + self.mail + self.wifi + self.printing + self.idle
+
+    @property
+    def total(self) -> float:
+        return sum(self.as_results().values())
+
+    def as_results(self) -> dict[str, float]:
+        """Stesso formato di `st.session_state.results`."""
+        return {
+            "Devices": self.devices_total,
+            "E-Waste": self.ewaste_total,
+            "Digital Activities": self.digital_total,
+            "AI Tools": self.ai,
+        }
+
+
+def adj_years(years: float, used: str, shared: str, fs: FactorSet | None = None) -> float:
+    """Anni di vita "effettivi" su cui ammortizzare la produzione del device."""
+    if years <= 0:
+        return 0.0
+    fs = fs or factors.current()
+    return years * fs.adj_arr[schema.CONDITION.find(used), schema.OWNERSHIP.find(shared)]
+
+
+def device_footprint(dev: DeviceAnswer, fs: FactorSet | None = None) -> DeviceFootprint:
+    fs = fs or factors.current()
+    impact = fs.device_arr[schema.DEVICE.find(dev.kind)]
+    adj = adj_years(float(dev.years or 0), dev.used, dev.shared, fs)
+    eol_mod = fs.eol_arr[schema.EOL.find(dev.eol)]
+    prod_per_year = impact / adj if adj else 0
+    eol_impact = (impact * eol_mod) / adj if adj else 0
+    return DeviceFootprint(dev.kind, float(adj), float(prod_per_year), float(eol_impact))
+
+
+def compute_footprint(answers: Answers, fs: FactorSet | None = None) -> Footprint:
+    """Calcola le emissioni annue (kg CO2e) per categoria e per device."""
+    fs = fs or factors.current()
+    days, ef = fs.days, fs.ef
+    devices = tuple(device_footprint(d, fs) for d in answers.devices)
+
+    role_factors = fs.activity_arr[schema.ROLE.find(answers.role)]
+    hours_total = 0
+    for act, ore in answers.activity_hours.items():
+        hours_total += ore * role_factors[schema.ACTIVITY.find(act)] * days
+
+    em_plain = fs.email_arr[schema.EMAIL_BUCKET.find(answers.email_plain)]
+    em_attach = fs.email_arr[schema.EMAIL_BUCKET.find(answers.email_attach)]
+    cld = fs.cloud_arr[schema.CLOUD_BUCKET.find(answers.cloud)]
+    mail_total = (em_plain * ef["email_plain"] + em_attach * ef["email_attach"] + cld * ef["cloud_gb"]) * days
+    wifi_total = answers.wifi_hours * ef["wifi_hour"] * days
+    print_total = int(answers.pages or 0) * ef["print_page"] * (days / 5)
+
+    if answers.idle == IDLE_ON:
+        idle_total = days * ef["idle_on"] * fs.idle_hours
+    elif answers.idle == IDLE_OFF:
+        idle_total = days * ef["idle_off"] * fs.idle_hours
+    else:
+        idle_total = 0
+
+    ai_total = 0
+    for task, q in answers.ai_queries.items():
+        ai_total += q * fs.ai_arr[schema.AI_TASK.find(task)] * days
+
+    return Footprint(
+        devices=devices,
+        activities=float(hours_total),
+        mail=float(mail_total),
+        wifi=float(wifi_total),
+        printing=float(print_total),
+        idle=float(idle_total),
+        ai=float(ai_total),
+        factor_version=fs.version,
+    )
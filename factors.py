@@ -0,0 +1,216 @@
+"""
+Fattori di emissione, caricati da un file JSON versionato (factors.json).
+
+Il file viene validato contro `schema` (ogni etichetta deve avere un codice) e
+compilato una volta in un `FactorSet` immutabile: dizionari per etichetta per
+le pagine e array indicizzati per codice per engine e batch.
+
+`current()` controlla il mtime del file al massimo ogni CHECK_INTERVAL
+secondi. Se è cambiato, ricarica e sostituisce il FactorSet con un solo
+assegnamento, senza riavviare il server o perdere sessioni. Se il nuovo file
+non è valido, resta in uso quello vecchio. Anche un file con valori diversi ma
+la stessa `version` viene rifiutato: answer_cache e results.fingerprint sono
+indicizzati per versione e continuerebbero a servire i calcoli vecchi.
+
+    python factors.py [path]    # valida il file e stampa un riepilogo
+"""
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+import schema
+
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+FACTORS_PATH = os.environ.get("FACTORS_PATH", os.path.join(APP_DIR, "factors.json"))
+CHECK_INTERVAL = 2.0
+
+EF_KEYS = ["email_plain", "email_attach", "cloud_gb", "wifi_hour", "print_page", "idle_on", "idle_off"]
+
+
+@dataclass(frozen=True)
+class FactorSet:
+    version: int
+    days: int
+    idle_hours: int
+    ef: dict                    # EF_KEYS -> kg CO2e per unità
+    # per etichetta (pagine)
+    device_ef: dict
+    default_lifespan: dict
+    eol_modifier: dict
+    adj_years_multiplier: dict  # (condizione, ownership) -> moltiplicatore
+    activity_factors: dict      # ruolo -> {attività: ef}
+    ai_factors: dict
+    emails: dict
+    cloud_gb: dict
+    # per codice di schema (engine e batch)
+    device_arr: np.ndarray
+    lifespan_arr: np.ndarray
+    eol_arr: np.ndarray
+    adj_arr: np.ndarray         # [CONDITION, OWNERSHIP], 1.0 dove manca
+    activity_arr: np.ndarray    # [ROLE, ACTIVITY]
+    ai_arr: np.ndarray
+    email_arr: np.ndarray
+    cloud_arr: np.ndarray
+    digest: str = ""            # sha1 del contenuto del file, per riconoscere modifiche senza nuova versione
+
+
+def _number(errors, where, v, positive=False):
+    if isinstance(v, bool) or not isinstance(v, (int, float)) or not math.isfinite(v):
+        errors.append(f"{where}: expected a number, got {v!r}")
+    elif positive and v <= 0:
+        errors.append(f"{where}: must be > 0, got {v!r}")
+
+
+def _table(errors, data, key, book, positive=False):
+    table = data.get(key)
+    if not isinstance(table, dict) or not table:
+        errors.append(f"{key}: expected a non-empty object")
+        return {}
+    for label, v in table.items():
+        if book.find(label) == schema.MISSING:
+            errors.append(f"{key}: unknown {book.name} {label!r}")
+        _number(errors, f"{key}[{label!r}]", v, positive)
+    return table
+
+
+def validate(data: dict) -> list[str]:
+    """Lista dei problemi trovati (vuota se il file è valido)."""
+    errors = []
+    if not isinstance(data.get("version"), int) or isinstance(data.get("version"), bool):
+        errors.append("version: expected an integer")
+    _number(errors, "days", data.get("days"), positive=True)
+    _number(errors, "idle_hours", data.get("idle_hours"), positive=True)
+    ef = data.get("ef") if isinstance(data.get("ef"), dict) else {}
+    for k in EF_KEYS:
+        _number(errors, f"ef.{k}", ef.get(k))
+
+    devices = _table(errors, data, "device_ef", schema.DEVICE, positive=True)
+    lifespans = _table(errors, data, "default_lifespan", schema.DEVICE, positive=True)
+    for d in set(devices) - set(lifespans):
+        errors.append(f"default_lifespan: missing {d!r}")
+    _table(errors, data, "eol_modifier", schema.EOL)
+    _table(errors, data, "ai_factors", schema.AI_TASK)
+    _table(errors, data, "emails", schema.EMAIL_BUCKET)
+    _table(errors, data, "cloud_gb", schema.CLOUD_BUCKET)
+
+    adj = data.get("adj_years_multiplier")
+    if not isinstance(adj, dict):
+        errors.append("adj_years_multiplier: expected an object")
+        adj = {}
+    for used, row in adj.items():
+        if schema.CONDITION.find(used) == schema.MISSING:
+            errors.append(f"adj_years_multiplier: unknown condition {used!r}")
+        _table(errors, adj, used, schema.OWNERSHIP, positive=True)
+
+    roles = data.get("activity_factors")
+    if not isinstance(roles, dict) or not roles:
+        errors.append("activity_factors: expected a non-empty object")
+        roles = {}
+    for role in roles:
+        if schema.ROLE.find(role) == schema.MISSING:
+            errors.append(f"activity_factors: unknown role {role!r}")
+        _table(errors, roles, role, schema.ACTIVITY)
+    return errors
+
+
+def compile_factors(data: dict) -> FactorSet:
+    errors = validate(data)
+    if errors:
+        raise ValueError("invalid factor file:\n  " + "\n  ".join(errors))
+
+    adj = {(u, s): float(m) for u, row in data["adj_years_multiplier"].items() for s, m in row.items()}
+    adj_arr = np.ones((len(schema.CONDITION), len(schema.OWNERSHIP)), dtype=np.float64)
+    for (u, s), m in adj.items():
+        adj_arr[schema.CONDITION.code(u), schema.OWNERSHIP.code(s)] = m
+    activity_arr = np.zeros((len(schema.ROLE), len(schema.ACTIVITY)), dtype=np.float64)
+    for role, table in data["activity_factors"].items():
+        activity_arr[schema.ROLE.code(role)] = schema.ACTIVITY.table(table)
+
+    fs = FactorSet(
+        version=data["version"],
+        days=data["days"],
+        idle_hours=data["idle_hours"],
+        ef={k: data["ef"][k] for k in EF_KEYS},
+        device_ef=dict(data["device_ef"]),
+        default_lifespan=dict(data["default_lifespan"]),
+        eol_modifier=dict(data["eol_modifier"]),
+        adj_years_multiplier=adj,
+        activity_factors={r: dict(t) for r, t in data["activity_factors"].items()},
+        ai_factors=dict(data["ai_factors"]),
+        emails=dict(data["emails"]),
+        cloud_gb=dict(data["cloud_gb"]),
+        device_arr=schema.DEVICE.table(data["device_ef"]),
+        lifespan_arr=schema.DEVICE.table(data["default_lifespan"]),
+        eol_arr=schema.EOL.table(data["eol_modifier"]),
+        adj_arr=adj_arr,
+        activity_arr=activity_arr,
+        ai_arr=schema.AI_TASK.table(data["ai_factors"]),
+        email_arr=schema.EMAIL_BUCKET.table(data["emails"]),
+        cloud_arr=schema.CLOUD_BUCKET.table(data["cloud_gb"]),
+        digest=hashlib.sha1(json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest(),
+    )
+    for name in ("device_arr", "lifespan_arr", "eol_arr", "adj_arr", "activity_arr", "ai_arr", "email_arr", "cloud_arr"):
+        getattr(fs, name).flags.writeable = False
+    return fs
+
+
+def load(path: str = FACTORS_PATH) -> FactorSet:
+    with open(path, encoding="utf-8") as f:
+        return compile_factors(json.load(f))
+
+
+# --- FactorSet corrente, ricaricato quando il file cambia
+
+_lock = threading.Lock()
+_current = None
+_mtime = None
+_checked = 0.0
+
+
+def current() -> FactorSet:
+    global _current, _mtime, _checked
+    fs = _current
+    if fs is not None and time.monotonic() - _checked < CHECK_INTERVAL:
+        return fs
+    with _lock:
+        _checked = time.monotonic()
+        try:
+            mtime = os.stat(FACTORS_PATH).st_mtime_ns
+        except OSError as e:
+            if _current is None:
+                raise
+            print(f"[factors] cannot stat {FACTORS_PATH}: {e}", file=sys.stderr)
+            return _current
+        if mtime == _mtime:
+            return _current
+        try:
+            fs = load(FACTORS_PATH)
+        except (OSError, ValueError) as e:
+            if _current is None:
+                raise
+            _mtime = mtime  # non riprovare finché il file non cambia di nuovo
+            print(f"[factors] reload failed, keeping v{_current.version}: {e}", file=sys.stderr)
+            return _current
+        if _current is not None and fs.version == _current.version and fs.digest != _current.digest:
+            _mtime = mtime
+            print(f"[factors] {FACTORS_PATH} changed without a version bump, keeping v{_current.version}",
+                  file=sys.stderr)
+            return _current
+        if _current is not None:
+            print(f"[factors] reloaded: v{_current.version} -> v{fs.version}", file=sys.stderr)
+        _current, _mtime = fs, mtime
+        return fs
+
+
+if __name__ == "__main__":
+    fs = load(sys.argv[1] if len(sys.argv) > 1 else FACTORS_PATH)
+    print(f"factors v{fs.version}: {len(fs.device_ef)} devices, {len(fs.eol_modifier)} end-of-life options, "
+          f"{sum(len(t) for t in fs.activity_factors.values())} role activities, {len(fs.ai_factors)} AI tasks")
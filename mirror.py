@@ -0,0 +1,183 @@
+"""
+Copia locale dei risultati salvati, aggiornata in modo incrementale.
+
+Rileggere tutto il foglio diventa più lento a ogni risposta. Il mirror tiene
+in colonne locali le righe già lette e a ogni `sync()` chiede al backend solo
+quelle dopo il cursore: (righe già copiate, checksum dell'ultima). L'ultima
+riga copiata viene riletta insieme alle nuove; se non combacia più (righe
+cancellate o riordinate prima del cursore) il mirror riparte da zero. Il
+foglio è append-only: modifiche a mano di righe già copiate non si vedono.
+Le righe appese da altri processi durante una lettura arrivano al sync dopo.
+
+Le righe lette vengono aggiunte a un file JSON lines, così dopo un riavvio si
+riparte dal cursore salvato e non dalla prima riga.
+
+    python mirror.py    # sync dal backend di STORAGE_BACKEND e riepilogo
+"""
+import json
+import math
+import os
+import sys
+import threading
+import time
+import zlib
+
+import pandas as pd
+
+from storage import RESULT_COLUMNS, StorageBackend
+
+
+PAGE_SIZE = 1000
+NUMERIC_COLUMNS = {"CO2 Devices", "CO2 E-Waste", "CO2 AI", "CO2 Digital Activities", "CO2 Total", "Factor Version"}
+
+
+def row_checksum(row) -> int:
+    return zlib.crc32(json.dumps([str(v) for v in row]).encode("utf-8"))
+
+
+def _number(v) -> float:
+    # il foglio restituisce stringhe, anche con la virgola decimale
+    if isinstance(v, (int, float)):
+        return float(v)
+    try:
+        return float(str(v).strip().replace(",", "."))
+    except ValueError:
+        return math.nan
+
+
+class ResultsMirror:
+    def __init__(self, backend: StorageBackend, path: str | None = None, page_size: int = PAGE_SIZE):
+        self.backend = backend
+        self.path = path
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._reset()
+
+        self.syncs = 0
+        self.resyncs = 0
+        self.rows_read = 0
+        self.last_sync_ms = None
+        self.last_added = 0
+        if path and os.path.exists(path):
+            self._load()
+
+    def _reset(self):
+        self._columns = {c: [] for c in RESULT_COLUMNS}
+        self._sums = {}             # ruolo -> [somma CO2 Total, count]
+        self.offset = 0
+        self.checksum = None
+
+    def _ingest(self, rows: list[list]):
+        for raw in rows:
+            row = list(raw) + [""] * (len(RESULT_COLUMNS) - len(raw))
+            for c, v in zip(RESULT_COLUMNS, row):
+                self._columns[c].append(_number(v) if c in NUMERIC_COLUMNS else v)
+            role = str(row[0] or "").strip()
+            total = _number(row[5])
+            if role and not math.isnan(total):
+                s = self._sums.setdefault(role, [0.0, 0])
+                s[0] += total
+                s[1] += 1
+        if rows:
+            self.offset += len(rows)
+            self.checksum = row_checksum(rows[-1])
+
+    # --- file locale
+
+    def _load(self):
+        good = 0    # byte dopo l'ultima riga valida
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("missing newline")
+                    rows = json.loads(line)["rows"]
+                except (ValueError, KeyError, TypeError):
+                    break  # ultima riga troncata da un crash: il resto arriva col prossimo sync
+                self._ingest(rows)
+                good += len(line)
+            size = f.seek(0, os.SEEK_END)
+        if size > good:
+            # taglia la coda rotta: le prossime append ripartono dall'ultima riga buona
+            print(f"[mirror] dropping {size - good} bytes after row {self.offset} in {self.path}", file=sys.stderr)
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+
+    def _save_rows(self, rows: list[list]):
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"rows": rows}) + "\n")
+
+    def _truncate(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    # --- sync
+
+    def sync(self) -> int:
+        """Copia le righe nuove dal backend; ritorna quante ne ha aggiunte."""
+        with self._lock:
+            t0 = time.perf_counter()
+            added = 0
+            while True:
+                check = 1 if self.offset else 0
+                rows = self.backend.read_rows(self.offset - check, self.page_size + check)
+                self.rows_read += len(rows)
+                if check:
+                    if not rows or row_checksum(rows[0]) != self.checksum:
+                        print(f"[mirror] row {self.offset} changed in the backend, full resync", file=sys.stderr)
+                        self._reset()
+                        self._truncate()
+                        self.resyncs += 1
+                        added = 0
+                        continue
+                    rows = rows[1:]
+                if rows:
+                    self._ingest(rows)
+                    self._save_rows(rows)
+                    added += len(rows)
+                if len(rows) < self.page_size:
+                    break
+            self.syncs += 1
+            self.last_added = added
+            self.last_sync_ms = (time.perf_counter() - t0) * 1000
+            return added
+
+    # --- letture (tutte locali)
+
+    def role_stats(self) -> list[dict]:
+        """Righe come il tab 'Stats' (Role, AvgCO2, Count), dai totali del mirror."""
+        with self._lock:
+            return [{"Role": r, "AvgCO2": t / n, "Count": n} for r, (t, n) in self._sums.items()]
+
+    def fetch_role_stats(self) -> list[dict]:
+        """sync() e poi role_stats(): stessa firma del backend, per RoleStatsCache."""
+        self.sync()
+        return self.role_stats()
+
+    def frame(self) -> pd.DataFrame:
+        """Tutte le righe copiate, per le analisi."""
+        with self._lock:
+            return pd.DataFrame({c: list(v) for c, v in self._columns.items()})
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rows": self.offset,
+                "syncs": self.syncs,
+                "resyncs": self.resyncs,
+                "rows_read": self.rows_read,
+                "last_added": self.last_added,
+                "last_sync_ms": self.last_sync_ms,
+            }
+
+
+if __name__ == "__main__":
+    from storage import from_env
+
+    m = ResultsMirror(from_env(), os.environ.get("MIRROR_PATH"))
+    before = m.offset
+    added = m.sync()
+    print(f"{before:,} rows from the local file, {added:,} new from the backend in {m.last_sync_ms:.0f} ms")
+    for row in m.role_stats():
+        print(f"{row['Role']:14} {row['Count']:6,}  avg {row['AvgCO2']:8.1f} kg")
@@ -0,0 +1,148 @@
+"""
+Protezioni per le chiamate a un backend remoto: token bucket, circuit breaker
+e istogrammi di latenza. Nessuna dipendenza, thread-safe.
+"""
+import math
+import threading
+import time
+
+
+class TokenBucket:
+    """`rate` token al secondo, al massimo `capacity` accumulati (burst)."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_s = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Aspetta un token; False se non arriva entro `timeout` secondi."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+            with self._lock:
+                self.waited_s += wait
+
+
+class CircuitOpen(Exception):
+    """Il backend ha fallito troppe volte di fila: la chiamata non viene fatta."""
+
+
+class CircuitBreaker:
+    """
+    Dopo `failures` errori consecutivi si apre e ogni chiamata fallisce subito
+    con CircuitOpen. Dopo `reset_after` secondi lascia passare una chiamata di
+    prova (half-open): se va bene si richiude, altrimenti resta aperto.
+    """
+
+    def __init__(self, failures: int = 5, reset_after: float = 30.0):
+        self.failures = failures
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at = None
+        self._probing = False
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or time.monotonic() - self._opened_at >= self.reset_after:
+                return "half-open"
+            return "open"
+
+    def before(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if not self._probing and time.monotonic() - self._opened_at >= self.reset_after:
+                self._probing = True   # una sola chiamata di prova alla volta
+                return
+            self.rejected += 1
+        raise CircuitOpen("backend unavailable, circuit open")
+
+    def success(self):
+        self.reset()
+
+    def release(self):
+        """La chiamata di prova non è arrivata al backend: resta aperto, la prossima può riprovare."""
+        with self._lock:
+            self._probing = False
+
+    def reset(self):
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._probing = False
+
+    def failure(self):
+        with self._lock:
+            self._consecutive += 1
+            if self._probing or self._consecutive >= self.failures:
+                if self._opened_at is None or self._probing:
+                    self.opened += 1
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class LatencyHistogram:
+    """Conteggi per bucket fissi (ms); i quantili sono il limite superiore del bucket."""
+
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, math.inf)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * len(self.BUCKETS_MS)
+        self.count = 0
+        self.errors = 0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float, error: bool = False):
+        i = next(i for i, edge in enumerate(self.BUCKETS_MS) if ms <= edge)
+        with self._lock:
+            self._counts[i] += 1
+            self.count += 1
+            self.errors += error
+            self.max_ms = max(self.max_ms, ms)
+
+    def _quantile(self, q: float):
+        rank, seen = q * self.count, 0
+        for edge, c in zip(self.BUCKETS_MS, self._counts):
+            seen += c
+            if c and seen >= rank:
+                return self.max_ms if math.isinf(edge) else edge
+        return None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "errors": self.errors,
+                "p50_ms": self._quantile(0.5),
+                "p95_ms": self._quantile(0.95),
+                "p99_ms": self._quantile(0.99),
+                "max_ms": round(self.max_ms, 1),
+                "buckets": {
+                    ("inf" if math.isinf(edge) else f"<={edge}"): c
+                    for edge, c in zip(self.BUCKETS_MS, self._counts) if c
+                },
+            }
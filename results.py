@@ -0,0 +1,110 @@
+"""
+Tutto ciò che mostrano le pagine dei risultati, calcolato in un colpo solo.
+
+`build_bundle()` non usa Streamlit: viene lanciato nel pool in background,
+insieme alla valutazione delle risposte, appena l'utente preme Next nel
+questionario (vedi views/prefetch.py), così mentre sceglie l'archetipo sono
+già pronti footprint, categoria principale, consigli,
+virtù, azioni con più leva, equivalenze e grafico. Il confronto con i pari
+(lookup di rete) non fa parte del bundle: ha un job suo in prefetch.
+
+Il bundle è immutabile e porta l'impronta delle risposte da cui è nato
+(`fingerprint()`): le pagine lo riusano finché le risposte non cambiano.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import tips
+from answer_cache import Evaluation
+
+
+MIN_SAMPLES = 10
+TOP_ACTIONS = 3
+
+# categorie di `results` -> nomi mostrati (cards, grafico, consigli)
+CATEGORY_LABELS = {
+    "Devices": "Devices",
+    "E-Waste": "E-Waste",
+    "Digital Activities": "Digital Activities",
+    "AI Tools": "Artificial Intelligence",
+}
+
+@dataclass(frozen=True)
+class ResultsBundle:
+    fingerprint: str
+    results: MappingProxyType
+    total: float
+    top_category: str
+    top_tips: tuple
+    other_tips: tuple       # ((categoria, (tip, ...)), ...)
+    virtues: tuple
+    top_actions: tuple      # (sensitivity.Action, ...) dal risparmio maggiore
+    equivalences: MappingProxyType
+    chart: object           # figura plotly della pagina breakdown
+
+
+def fingerprint(answers_code, name: str, role: str, factor_version) -> str:
+    """Impronta di tutto ciò da cui dipende il bundle (risposte, seed dei consigli, fattori)."""
+    key = {"answers": answers_code, "name": name, "role": role, "factors": factor_version}
+    return hashlib.sha1(json.dumps(key, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def top_category(results: dict) -> str:
+    by_label = {label: results.get(cat, 0) for cat, label in CATEGORY_LABELS.items()}
+    return max(by_label, key=by_label.get)
+
+
+def peer_average(aggregates, lookup, role: str):
+    """(media, n) dei pari ruolo: prima gli aggregati locali (media di Welford), poi il backend."""
+    agg = aggregates.summary(role, "CO2 Total")
+    if agg["count"] >= MIN_SAMPLES:
+        # media, non mediana: la card la presenta come "average" come quella del backend
+        return agg["mean"], agg["count"]
+    return lookup(role)
+
+
+def equivalences(total: float) -> dict:
+    return {
+        "burgers": total / 4.6,
+        "led_days": (total / 0.256) / 24,
+        "car_km": total / 0.17,
+        "netflix_hours": total / 0.055,
+    }
+
+
+def breakdown_chart(results: dict):
+    import pandas as pd
+    import plotly.express as px
+
+    df_plot = pd.DataFrame({
+        "Category": ["Devices", "Digital Activities", "Artificial Intelligence", "E-Waste"],
+        "CO₂e (kg)": [results["Devices"], results["Digital Activities"], results["AI Tools"], results["E-Waste"]]
+    })
+    fig = px.bar(df_plot, x="CO₂e (kg)", y="Category", orientation="h",
+                 color="Category",
+                 color_discrete_sequence=["#95d5b2", "#74c69d", "#52b788", "#1b4332"],
+                 height=400)
+    fig.update_layout(showlegend=False, plot_bgcolor="#f1faee", paper_bgcolor="#f1faee", font_family="Inter")
+    fig.update_traces(marker=dict(line=dict(width=1.5, color='white')))
+    return fig
+
+
+def build_bundle(key: str, evaluation: Evaluation, name: str, role: str) -> ResultsBundle:
+    results = evaluation.footprint.as_results()
+    total = sum(results.values())
+    top = top_category(results)
+    top_tips, other_tips = tips.select_tips(evaluation.personalized, top, f"{name}|{role}")
+    return ResultsBundle(
+        fingerprint=key,
+        results=MappingProxyType(dict(results)),
+        total=total,
+        top_category=top,
+        top_tips=tuple(top_tips),
+        other_tips=tuple((cat, tuple(picked)) for cat, picked in other_tips),
+        virtues=evaluation.virtues,
+        top_actions=evaluation.actions[:TOP_ACTIONS],
+        equivalences=MappingProxyType(equivalences(total)),
+        chart=breakdown_chart(results),
+    )
@@ -0,0 +1,124 @@
+"""
+Cache condivisa (tra tutte le sessioni del processo) delle medie per ruolo.
+
+Il tab 'Stats' viene letto al massimo una volta per TTL: dopo la scadenza
+il valore vecchio viene servito subito mentre un solo thread in background
+lo aggiorna (stale-while-revalidate).
+"""
+import threading
+import time
+
+
+def _to_float(x):
+    # Converte "310,2" o "310.2" in float, gestisce None
+    if x is None:
+        return None
+    if isinstance(x, (int, float)):
+        return float(x)
+    s = str(x).strip().replace(" ", "").replace(",", ".")
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def build_role_index(rows) -> dict[str, tuple[float | None, int]]:
+    """{role: (avg, count)} dalle righe del tab 'Stats'; vince la prima riga per ruolo."""
+    index = {}
+    for row in rows:
+        role = (row.get("Role") or "").strip()
+        if role and role not in index:
+            avg = _to_float(row.get("AvgCO2"))
+            cnt = int(_to_float(row.get("Count")) or 0)
+            index[role] = (avg, cnt)
+    return index
+
+
+class RoleStatsCache:
+    def __init__(self, loader, ttl: float = 300.0):
+        self._loader = loader
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._index = None
+        self._loaded_at = 0.0
+        self._refreshing = False
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._refresh_ms = []
+
+    def get(self, role: str) -> tuple[float | None, int | None]:
+        """(avg, count) per il ruolo, oppure (None, None). Solleva solo se non c'è ancora nessun dato."""
+        role = (role or "").strip()
+        with self._lock:
+            index = self._index
+            if index is not None:
+                if time.monotonic() - self._loaded_at <= self.ttl:
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+                    if not self._refreshing:
+                        self._refreshing = True
+                        threading.Thread(target=self._background_refresh, daemon=True).start()
+            else:
+                self.misses += 1
+
+        if index is None:
+            index = self._load_blocking()
+        return index.get(role, (None, None))
+
+    def _load_blocking(self):
+        # primo caricamento: un solo thread legge, gli altri aspettano il risultato
+        with self._load_lock:
+            with self._lock:
+                if self._index is not None:
+                    return self._index
+            return self._refresh()
+
+    def _refresh(self):
+        t0 = time.perf_counter()
+        try:
+            index = build_role_index(self._loader())
+        except Exception:
+            with self._lock:
+                self.refresh_errors += 1
+            raise
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self._index = index
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+            self._refresh_ms = (self._refresh_ms + [elapsed_ms])[-100:]
+        return index
+
+    def _background_refresh(self):
+        try:
+            self._refresh()
+        except Exception:
+            pass  # resta il valore vecchio, si riprova alla prossima lettura
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lat = self._refresh_ms
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "last_refresh_ms": lat[-1] if lat else None,
+                "avg_refresh_ms": sum(lat) / len(lat) if lat else None,
+                "max_refresh_ms": max(lat) if lat else None,
+                "age_s": time.monotonic() - self._loaded_at if self._index is not None else None,
+            }
@@ -0,0 +1,272 @@
+"""
+Motore a regole per consigli e virtù.
+
+Una regola è dichiarativa: categoria, condizioni (feature, operatore, soglia)
+in AND e un testo con segnaposto delle feature. Le regole vengono compilate
+una volta (RuleSet, a livello di modulo in tips.py) e valutate in un solo
+passaggio sul vettore di feature di un utente, oppure su un DataFrame con una
+riga per rispondente per sapere quanti utenti attivano ogni regola.
+
+Le feature escono da `feature_frame()`, vettoriale sugli stessi frame long
+di batch.py (una o centomila risposte, stesso codice). Nei testi `{x:kg}`
+formatta un valore in kg CO₂e come nelle pagine (0 decimali da 10 in su).
+
+    python rules.py --synthetic 100000   # quota di utenti per regola, risposte casuali
+    python rules.py                      # idem, dalle risposte salvate (STORAGE_BACKEND)
+"""
+import argparse
+import json
+import operator
+import string
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import batch
+import factors
+import schema
+from engine import Answers, IDLE_OFF, IDLE_ON
+from factors import FactorSet
+
+
+OPS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+STORE_EOL = "I store it at home, unused"
+TRASH_EOL = "I throw it away in general waste"
+# alternative delle stime dei consigli e-waste (modificatori da fs.eol_arr)
+CERTIFIED_EOL = "I bring it to a certified e-waste collection center"
+REUSE_EOL = "I sell or donate it to someone else"
+GOOD_EOLS = {
+    CERTIFIED_EOL,
+    "I return it to manufacturer for recycling or reuse",
+    REUSE_EOL,
+    "Device provided by the university, I return it after use",
+}
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    category: str | None            # None: virtù
+    when: tuple                     # ((feature, op, valore), ...) in AND
+    text: str
+
+
+def fmt_kg(x: float) -> str:
+    # arrotonda "pulito": 0 decimali se grande, 1 decimale altrimenti
+    if x >= 10:
+        return f"{round(x):,}".replace(",", " ")
+    return f"{round(x, 1)}"
+
+
+class CompiledRule:
+    def __init__(self, rule: Rule):
+        self.rule = rule
+        self.conditions = [(feature, OPS[op], value) for feature, op, value in rule.when]
+        self.pieces = [(literal, field, spec) for literal, field, spec, _ in string.Formatter().parse(rule.text)]
+
+    def matches(self, features: dict) -> bool:
+        return all(op(features[f], v) for f, op, v in self.conditions)
+
+    def mask(self, frame: pd.DataFrame) -> np.ndarray:
+        return np.logical_and.reduce([op(frame[f], v).to_numpy() for f, op, v in self.conditions])
+
+    def render(self, features: dict) -> str:
+        out = []
+        for literal, field, spec in self.pieces:
+            out.append(literal)
+            if field is not None:
+                value = features[field]
+                out.append(fmt_kg(value) if spec == "kg" else format(value, spec))
+        return "".join(out)
+
+
+class RuleSet:
+    def __init__(self, rules: list[Rule]):
+        ids = [r.id for r in rules]
+        if len(set(ids)) != len(ids):
+            raise ValueError("duplicate rule ids")
+        self.rules = [CompiledRule(r) for r in rules]
+
+    def evaluate(self, features: dict) -> list[tuple[Rule, str]]:
+        """Regole attivate, nell'ordine in cui sono definite, con il testo."""
+        return [(c.rule, c.render(features)) for c in self.rules if c.matches(features)]
+
+    def frame(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Una colonna booleana per regola, una riga per rispondente."""
+        return pd.DataFrame({c.rule.id: c.mask(features) for c in self.rules}, index=features.index)
+
+    def trigger_rates(self, features: pd.DataFrame) -> pd.Series:
+        """Quota di rispondenti che attiva ogni regola."""
+        return self.frame(features).mean()
+
+
+# --- Feature
+
+def _first_max(values: np.ndarray, pos: np.ndarray, n: int) -> np.ndarray:
+    """Per rispondente, la prima riga col valore massimo (>0); -1 se nessuna."""
+    rows = np.flatnonzero(values > 0)
+    order = rows[np.lexsort((rows, -values[rows], pos[rows]))]
+    p = pos[order]
+    first = np.r_[True, p[1:] != p[:-1]] if len(p) else np.zeros(0, dtype=bool)
+    out = np.full(n, -1)
+    out[p[first]] = order[first]
+    return out
+
+
+def _take(values: np.ndarray, rows: np.ndarray, fill) -> np.ndarray:
+    if not len(values):
+        return np.full(len(rows), fill, dtype=values.dtype)
+    return np.where(rows >= 0, values[rows], fill)
+
+
+def _join_kinds(mask: np.ndarray, pos: np.ndarray, kind: np.ndarray, n: int) -> np.ndarray:
+    """Per rispondente, i tipi di device selezionati da `mask`, distinti e in ordine alfabetico."""
+    groups = {}
+    for p, k in zip(pos[mask].tolist(), kind[mask].tolist()):
+        groups.setdefault(p, set()).add(k)
+    out = np.full(n, "", dtype=object)
+    for p, kinds in groups.items():
+        out[p] = ", ".join(sorted(kinds))
+    return out
+
+
+def _features(resp: dict, dev: dict, items: dict, n: int, fs: FactorSet) -> dict:
+    """Feature come array (una posizione per rispondente), dalle colonne di batch.frame_columns."""
+    # --- Device
+    pos = dev["pos"]
+    code = dev["device"]
+    kind = np.array(schema.DEVICE.labels, dtype=object)[code]
+    years = dev["years"]
+    used = dev["used"]
+    shared = dev["shared"]
+    eol = dev["eol"]
+    eol_mod = fs.eol_arr[eol]
+    certified_mod = fs.eol_arr[schema.EOL.code(CERTIFIED_EOL)]
+    reuse_mod = fs.eol_arr[schema.EOL.code(REUSE_EOL)]
+    impact = fs.device_arr[code]
+    adj = np.where(years > 0, years * fs.adj_arr[used, shared], 0.0)
+    valid = (years > 0) & (impact > 0) & (adj > 0)
+    is_used = used == schema.CONDITION.code("Used")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # nuovo laptop/desktop -> ricondizionato (stessa condivisione)
+        laptop = code == schema.DEVICE.code("Laptop Computer")
+        pc = laptop | (code == schema.DEVICE.code("Desktop Computer"))
+        adj_new = years * fs.adj_arr[schema.CONDITION.code("New"), shared]
+        adj_used = years * fs.adj_arr[schema.CONDITION.code("Used"), shared]
+        ok = valid & pc & (used == schema.CONDITION.code("New")) & (adj_new > 0) & (adj_used > 0)
+        new_pc_saving = np.where(ok, impact * (1.0 / adj_new - 1.0 / adj_used), 0.0)
+
+        # vita utile <= 3 anni -> +2 anni
+        adj_ext = (years + 2.0) * fs.adj_arr[used, shared]
+        ok = valid & (years <= 3) & (adj_ext > 0)
+        extend_saving = np.where(ok, impact * (1.0 / adj - 1.0 / adj_ext), 0.0)
+
+        stored = valid & (eol == schema.EOL.code(STORE_EOL))
+        saving_min = np.where(stored, np.maximum(0.0, impact * (eol_mod - certified_mod) / adj), 0.0)
+        saving_max = np.where(stored, np.maximum(0.0, impact * (eol_mod - reuse_mod) / adj), 0.0)
+        trash = eol == schema.EOL.code(TRASH_EOL)
+        trash_saving = np.where(trash & valid, np.maximum(0.0, impact * (eol_mod - reuse_mod) / adj), 0.0)
+
+    def total(values) -> np.ndarray:
+        return np.bincount(pos, weights=values, minlength=n)
+
+    new_pc = _first_max(new_pc_saving, pos, n)
+    extend = _first_max(extend_saving, pos, n)
+    extend_years = _take(years, extend, 0.0)
+
+    # --- Attività digitali e AI
+    em_plain = fs.email_arr[resp["email_plain"]].astype(np.int64)
+    em_attach = fs.email_arr[resp["email_attach"]].astype(np.int64)
+    cloud_gb = fs.cloud_arr[resp["cloud"]].astype(np.float64)
+    idle = resp["idle"]
+    is_ai = items["kind"] == batch.ITEM_AI
+    ai_total = np.bincount(items["pos"][is_ai], weights=items["amount"][is_ai], minlength=n)
+
+    return {
+        "new_pc_saving": _take(new_pc_saving, new_pc, 0.0),
+        "new_pc_noun": np.where(new_pc < 0, "", np.where(_take(laptop, new_pc, False), "laptop", "desktop")).astype(object),
+        "extend_saving": _take(extend_saving, extend, 0.0),
+        "extend_kind": np.array([k.lower() for k in _take(kind, extend, "")], dtype=object),
+        "extend_years": extend_years,
+        "extend_years_after": extend_years + 2.0,
+        "stored_kinds": _join_kinds(stored, pos, kind, n),
+        "stored_saving_min": total(saving_min),
+        "stored_saving_max": total(saving_max),
+        "trash_kinds": _join_kinds(trash, pos, kind, n),
+        "trash_saving": total(trash_saving),
+        "used_kinds": _join_kinds(is_used, pos, kind, n),
+        "long_lived_kinds": _join_kinds(years > 5, pos, kind, n),
+        "has_good_eol": total(np.isin(eol, [schema.EOL.code(e) for e in GOOD_EOLS])) > 0,
+        "em_plain": em_plain,
+        "em_attach": em_attach,
+        "cloud_gb": cloud_gb,
+        "em_plain_impact": em_plain * fs.ef["email_plain"] * fs.days,
+        "em_attach_impact": em_attach * fs.ef["email_attach"] * fs.days,
+        "cloud_impact": cloud_gb * fs.ef["cloud_gb"],
+        "idle_left_on": idle == schema.IDLE.code(IDLE_ON),
+        "idle_turns_off": idle == schema.IDLE.code(IDLE_OFF),
+        "idle_saving": np.full(n, fs.days * fs.idle_hours * (fs.ef["idle_on"] - fs.ef["idle_off"])),
+        "pages": resp["pages"],
+        "ai_total_queries": ai_total.astype(np.int64),
+    }
+
+
+def feature_frame(respondents: pd.DataFrame, devices: pd.DataFrame, items: pd.DataFrame,
+                  fs: FactorSet | None = None) -> pd.DataFrame:
+    """Feature di consigli e virtù, una riga per rispondente (frame codificati di batch)."""
+    index = pd.Index(respondents["respondent"], name="respondent")
+    columns = batch.frame_columns(respondents, devices, items)
+    return pd.DataFrame(_features(*columns, len(index), fs or factors.current()), index=index)
+
+
+def features(answers: Answers, fs: FactorSet | None = None) -> dict:
+    """Vettore di feature di un solo utente (stesso calcolo, senza passare da pandas)."""
+    return {k: v[0].item() if isinstance(v[0], np.generic) else v[0]
+            for k, v in _features(*batch.answer_columns(answers), 1, fs or factors.current()).items()}
+
+
+if __name__ == "__main__":
+    import storage
+    import tips
+
+    parser = argparse.ArgumentParser(description="Share of respondents triggering each tip and virtue rule.")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="use N random responses")
+    parser.add_argument("--backend", default=None, help="storage backend (default: STORAGE_BACKEND or sheets)")
+    args = parser.parse_args()
+
+    fs = factors.current()
+    if args.synthetic:
+        import random
+
+        rng = random.Random(0)
+        frames = batch.answers_to_frames({i: batch._random_answers(rng, rng.randint(1, 4)) for i in range(args.synthetic)})
+    else:
+        encoded = {}
+        for rows in storage.from_env(args.backend).iter_result_rows():
+            for row in rows:
+                try:
+                    e = json.loads(row.get("Answers") or "null")
+                except ValueError:
+                    continue
+                if isinstance(e, dict) and e.get("v") == schema.SCHEMA_VERSION:
+                    encoded[len(encoded)] = e
+        frames = batch.encoded_to_frames(encoded)
+
+    feats = feature_frame(*frames, fs)
+    print(f"{len(feats):,} respondents")
+    if feats.empty:
+        raise SystemExit(0)
+    rates = tips.RULES.trigger_rates(feats)
+    for c in tips.RULES.rules:
+        kind = c.rule.category or "virtue"
+        print(f"{rates[c.rule.id]:7.1%}  {kind:24} {c.rule.id}")
@@ -0,0 +1,187 @@
+"""
+Schema a codici interi per le risposte categoriali.
+
+Ogni variabile categoriale ha un `Codebook`: etichetta mostrata <-> codice
+intero compatto. Il codice 0 è sempre "nessuna risposta" (il placeholder dei
+select). Le pagine mostrano le etichette, mentre salvataggio e scoring in
+batch lavorano sui codici.
+
+I codici sono append-only: una nuova opzione prende il codice successivo e
+un'opzione rimossa lascia il suo codice inutilizzato. Qualunque modifica
+incrementa SCHEMA_VERSION, che viene salvato insieme ai dati codificati.
+
+    python schema.py    # elenca i codebook
+"""
+import numpy as np
+import pandas as pd
+
+
+SCHEMA_VERSION = 1
+MISSING = 0
+
+# placeholder dei select e risposte sullo standby
+SELECT = "-- Select --"
+SELECT_OPTION = "-- Select option --"
+
+IDLE_ON = "I leave it on (idle mode)"
+IDLE_OFF = "I turn it off"
+IDLE_NO_COMPUTER = "I don’t have a computer"
+
+
+class Codebook:
+    def __init__(self, name: str, labels: list[str], missing: str | None = None):
+        self.name = name
+        self.missing = missing
+        self.labels = (missing,) + tuple(labels)
+        self._codes = {label: code for code, label in enumerate(self.labels)}
+        if len(self._codes) != len(self.labels):
+            raise ValueError(f"duplicate labels in codebook {name!r}")
+
+    def __len__(self):
+        return len(self.labels)
+
+    def code(self, label) -> int:
+        if label is None or label == self.missing:
+            return MISSING
+        try:
+            return self._codes[label]
+        except KeyError:
+            raise ValueError(f"unknown {self.name} label: {label!r}") from None
+
+    def find(self, label) -> int:
+        """Come code(), ma le etichette sconosciute diventano MISSING."""
+        return self._codes.get(label, MISSING)
+
+    def label(self, code: int):
+        return self.labels[code]
+
+    def codes(self, values) -> np.ndarray:
+        """Versione vettoriale di code(); le etichette sconosciute diventano MISSING."""
+        codes = pd.Index(self.labels).get_indexer(values)
+        return np.where(codes < 0, MISSING, codes).astype(self.dtype)
+
+    @property
+    def dtype(self):
+        return np.int8 if len(self.labels) <= 127 else np.int16
+
+    def table(self, values: dict, default: float = 0.0) -> np.ndarray:
+        """Array indicizzato per codice con i valori di `values` (etichetta -> valore)."""
+        arr = np.full(len(self.labels), default, dtype=np.float64)
+        for label, v in values.items():
+            if label != self.missing:
+                arr[self.code(label)] = float(v)
+        return arr
+
+
+ROLE = Codebook("role", ["Student", "Professor", "Staff Member"], missing="")
+
+DEVICE = Codebook("device", [
+    "Desktop Computer",
+    "Laptop Computer",
+    "Smartphone",
+    "Tablet",
+    "External Monitor",
+    "Headphones",
+    "Printer",
+    "Home Router/Modem",
+    "Maxi-screen",
+    "Projector",
+], missing=SELECT)
+
+OWNERSHIP = Codebook("ownership", ["Personal", "Shared with family", "Shared in university"], missing=SELECT)
+
+CONDITION = Codebook("condition", ["New", "Used"], missing=SELECT)
+
+EOL = Codebook("eol", [
+    "I bring it to a certified e-waste collection center",
+    "I throw it away in general waste",
+    "I return it to manufacturer for recycling or reuse",
+    "I sell or donate it to someone else",
+    "I store it at home, unused",
+    "Device provided by the university, I return it after use",
+], missing=SELECT)
+
+ACTIVITY = Codebook("activity", [
+    "MS Office (e.g. Excel, Word, PPT, Outlook…)",
+    "Technical softwares (e.g. Matlab, Python…)",
+    "Web browsing",
+    "Watching lecture recordings",
+    "Online classes streaming or video call",
+    "Reading study materials on your computer (e.g. slides, articles, digital textbooks)",
+    "Videocall (e.g. Zoom, Teams…)",
+    "Online classes streaming",
+    "Reading materials on your computer (e.g. slides, articles, digital textbooks)",
+    "Management software (e.g. SAP)",
+    "Reading materials on your computer (e.g. documents)",
+])
+
+AI_TASK = Codebook("ai_task", [
+    "Summarize texts or articles",
+    "Translate sentences or texts",
+    "Explain a concept",
+    "Generate quizzes or questions",
+    "Write formal emails or messages",
+    "Correct grammar or style",
+    "Analyze long PDF documents",
+    "Write or test code",
+    "Generate images",
+    "Brainstorm for thesis or projects",
+    "Explain code step-by-step",
+    "Prepare lessons or presentations",
+])
+
+EMAIL_BUCKET = Codebook("email_bucket", ["0", "1–10", "11–20", "21–30", "31–40", "41–80", "81–100", ">100"], missing=SELECT_OPTION)
+
+CLOUD_BUCKET = Codebook("cloud_bucket", ["<5GB", "5–20GB", "20–50GB", "50–100GB", "100–200GB"], missing=SELECT_OPTION)
+
+IDLE = Codebook("idle", [IDLE_OFF, IDLE_ON, IDLE_NO_COMPUTER])
+
+CODEBOOKS = [ROLE, DEVICE, OWNERSHIP, CONDITION, EOL, ACTIVITY, AI_TASK, EMAIL_BUCKET, CLOUD_BUCKET, IDLE]
+
+
+# --- Answers <-> forma compatta (solo interi e numeri, pronta per JSON)
+
+def encode_answers(a) -> dict:
+    return {
+        "v": SCHEMA_VERSION,
+        "role": ROLE.code(a.role),
+        "dev": [
+            [DEVICE.code(d.kind), CONDITION.code(d.used), OWNERSHIP.code(d.shared), float(d.years or 0), EOL.code(d.eol)]
+            for d in a.devices
+        ],
+        "act": [[ACTIVITY.code(k), float(h)] for k, h in a.activity_hours.items() if h],
+        "mail": [EMAIL_BUCKET.code(a.email_plain), EMAIL_BUCKET.code(a.email_attach), CLOUD_BUCKET.code(a.cloud)],
+        "wifi": float(a.wifi_hours),
+        "pages": int(a.pages or 0),
+        "idle": IDLE.code(a.idle),
+        "ai": [[AI_TASK.code(k), int(q)] for k, q in a.ai_queries.items() if q],
+    }
+
+
+def decode_answers(data: dict):
+    from engine import Answers, DeviceAnswer
+
+    if data.get("v") != SCHEMA_VERSION:
+        raise ValueError(f"unsupported schema version: {data.get('v')!r}")
+    plain, attach, cloud = data["mail"]
+    return Answers(
+        role=ROLE.label(data["role"]),
+        devices=[
+            DeviceAnswer(DEVICE.label(k), CONDITION.label(u), OWNERSHIP.label(s), years, EOL.label(e))
+            for k, u, s, years, e in data["dev"]
+        ],
+        activity_hours={ACTIVITY.label(c): h for c, h in data["act"]},
+        email_plain=EMAIL_BUCKET.label(plain),
+        email_attach=EMAIL_BUCKET.label(attach),
+        cloud=CLOUD_BUCKET.label(cloud),
+        wifi_hours=data["wifi"],
+        pages=data["pages"],
+        idle=IDLE.label(data["idle"]),
+        ai_queries={AI_TASK.label(c): q for c, q in data["ai"]},
+    )
+
+
+if __name__ == "__main__":
+    for book in CODEBOOKS:
+        print(f"{book.name:14} {len(book) - 1:3} codes  {np.dtype(book.dtype).name}")
+    print(f"schema v{SCHEMA_VERSION}")
@@ -0,0 +1,230 @@
+"""
+Sensibilità del footprint a ogni risposta: quanto cambia il totale annuo
+(kg CO₂e/anno) se l'utente modifica una sola risposta di un passo.
+
+Passi valutati:
+  - device: +1 anno di vita, ogni fine vita alternativo
+  - attività: -1 h/giorno; task AI: -10 query/giorno; wi-fi: -1 h/giorno
+  - email e cloud: la fascia inferiore; stampa: -10 pagine/settimana
+  - standby: spegnere il computer
+
+Il modello è lineare in ogni risposta (o un rapporto, per la durata dei
+device), quindi le differenze si calcolano in forma chiusa con gli stessi
+fattori di engine/batch, per tutti i rispondenti e tutti i passi in un solo
+passaggio vettoriale, senza rieseguire il modello per ogni perturbazione.
+Un passo che non si può fare (0 ore, fascia già minima) non compare.
+
+    python sensitivity.py --synthetic 100000   # tempi e controllo su engine
+"""
+import argparse
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import batch
+import factors
+import schema
+from engine import Answers, IDLE_ON
+from factors import FactorSet
+
+
+YEARS_STEP = 1.0
+HOURS_STEP = 1.0
+AI_STEP = 10
+PAGES_STEP = 10
+
+# non è una scelta dell'utente: non viene proposto come alternativa
+UNIVERSITY_EOL = "Device provided by the university, I return it after use"
+
+COLUMNS = ["category", "input", "device", "action", "delta_kg"]
+
+
+@dataclass(frozen=True)
+class Action:
+    category: str
+    input: str
+    device: int         # posizione in Answers.devices, -1 per le altre risposte
+    action: str
+    delta_kg: float     # negativo: risparmio
+
+
+def _step_down(book: schema.Codebook, values: dict) -> np.ndarray:
+    """Per ogni codice, il codice della fascia immediatamente inferiore (sé stesso se è la minima)."""
+    out = np.arange(len(book))
+    options = sorted((v, book.code(label)) for label, v in values.items())
+    for label, v in values.items():
+        lower = [c for w, c in options if w < v]
+        if lower:
+            out[book.code(label)] = lower[-1]
+    return out
+
+
+def _labels(book: schema.Codebook) -> np.ndarray:
+    return np.array(book.labels, dtype=object)
+
+
+def _sensitivity(resp: dict, dev: dict, items: dict, fs: FactorSet) -> dict:
+    """Una riga per (rispondente, passo): colonne "pos" + COLUMNS, dalle colonne di batch.frame_columns."""
+    days, ef = fs.days, fs.ef
+    blocks = []
+
+    def add(pos, category, input, action, delta, device=None):
+        n = len(pos)
+        blocks.append({
+            "pos": np.asarray(pos, dtype=np.int64),
+            "category": np.full(n, category, dtype=object),
+            "input": np.broadcast_to(np.asarray(input, dtype=object), (n,)),
+            "device": np.full(n, -1, dtype=np.int64) if device is None else device,
+            "action": np.broadcast_to(np.asarray(action, dtype=object), (n,)),
+            "delta_kg": np.asarray(delta, dtype=np.float64),
+        })
+
+    # --- Device: produzione + fine vita ammortizzati sugli anni effettivi
+    pos = dev["pos"]
+    years = dev["years"]
+    m = fs.adj_arr[dev["used"], dev["shared"]]
+    impact = fs.device_arr[dev["device"]]
+    eol_mod = fs.eol_arr[dev["eol"]]
+    ok = (years > 0) & (m > 0) & (impact > 0)
+    order = np.argsort(pos, kind="stable")
+    starts = np.searchsorted(pos[order], pos[order])
+    ordinal = np.empty(len(pos), dtype=np.int64)
+    ordinal[order] = np.arange(len(pos)) - starts
+    kind = _labels(schema.DEVICE)[dev["device"]]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        adj = years * m
+        longer = impact * (1 + eol_mod) * (1 / ((years + YEARS_STEP) * m) - 1 / adj)
+    add(pos[ok], "Devices", kind[ok], f"Use it {YEARS_STEP:.0f} more year", longer[ok], ordinal[ok])
+
+    alternatives = np.array([schema.EOL.code(label) for label in fs.eol_modifier if label != UNIVERSITY_EOL])
+    rows = np.repeat(np.flatnonzero(ok), len(alternatives))
+    alt = np.tile(alternatives, ok.sum())
+    keep = alt != dev["eol"][rows]
+    rows, alt = rows[keep], alt[keep]
+    add(pos[rows], "E-Waste", kind[rows], "End of life: " + _labels(schema.EOL)[alt],
+        impact[rows] * (fs.eol_arr[alt] - eol_mod[rows]) / adj[rows], ordinal[rows])
+
+    # --- Attività e task AI (stesso frame, distinti da "kind")
+    is_ai = items["kind"] == batch.ITEM_AI
+    amount = items["amount"]
+    act = ~is_ai & (amount > 0)
+    act_ef = fs.activity_arr[resp["role"][items["pos"][act]], items["item"][act]]
+    add(items["pos"][act], "Digital Activities", _labels(schema.ACTIVITY)[items["item"][act]],
+        f"{HOURS_STEP:.0f} h/day less", -np.minimum(HOURS_STEP, amount[act]) * act_ef * days)
+    ai = is_ai & (amount > 0)
+    add(items["pos"][ai], "AI Tools", _labels(schema.AI_TASK)[items["item"][ai]],
+        f"{AI_STEP} queries/day less", -np.minimum(AI_STEP, amount[ai]) * fs.ai_arr[items["item"][ai]] * days)
+
+    # --- Email e cloud: fascia inferiore
+    n = len(resp["role"])
+    everyone = np.arange(n)
+    for col, book, values, arr, factor, name in [
+        ("email_plain", schema.EMAIL_BUCKET, fs.emails, fs.email_arr, ef["email_plain"], "Emails without attachments"),
+        ("email_attach", schema.EMAIL_BUCKET, fs.emails, fs.email_arr, ef["email_attach"], "Emails with attachments"),
+        ("cloud", schema.CLOUD_BUCKET, fs.cloud_gb, fs.cloud_arr, ef["cloud_gb"], "Cloud storage"),
+    ]:
+        cur = resp[col]
+        down = _step_down(book, values)[cur]
+        can = down != cur
+        add(everyone[can], "Digital Activities", name, "Down to " + _labels(book)[down[can]],
+            (arr[down[can]] - arr[cur[can]]) * factor * days)
+
+    # --- Wi-fi, stampa, standby
+    wifi = resp["wifi_hours"]
+    can = wifi > 0
+    add(everyone[can], "Digital Activities", "Wi-Fi", f"{HOURS_STEP:.0f} h/day less",
+        -np.minimum(HOURS_STEP, wifi[can]) * ef["wifi_hour"] * days)
+    pages = resp["pages"]
+    can = pages > 0
+    add(everyone[can], "Digital Activities", "Printing", f"{PAGES_STEP} pages/week less",
+        -np.minimum(PAGES_STEP, pages[can]) * ef["print_page"] * (days / 5))
+    can = resp["idle"] == schema.IDLE.code(IDLE_ON)
+    add(everyone[can], "Digital Activities", "Computer left on", "Turn it off",
+        np.full(can.sum(), days * fs.idle_hours * (ef["idle_off"] - ef["idle_on"])))
+
+    return {k: np.concatenate([b[k] for b in blocks]) for k in ["pos"] + COLUMNS}
+
+
+def sensitivity_frame(respondents: pd.DataFrame, devices: pd.DataFrame, items: pd.DataFrame,
+                      fs: FactorSet | None = None) -> pd.DataFrame:
+    """Tutti i passi di tutti i rispondenti (frame codificati di batch), formato long."""
+    out = _sensitivity(*batch.frame_columns(respondents, devices, items), fs or factors.current())
+    respondent = respondents["respondent"].to_numpy()[out.pop("pos")]
+    return pd.DataFrame({"respondent": respondent, **out})
+
+
+def ranked_actions(answers: Answers, fs: FactorSet | None = None, limit: int | None = None) -> list[Action]:
+    """I passi che riducono il footprint dell'utente, dal risparmio maggiore."""
+    out = _sensitivity(*batch.answer_columns(answers), fs or factors.current())
+    order = np.argsort(out["delta_kg"], kind="stable")
+    order = order[out["delta_kg"][order] < 0][:limit]
+    return [
+        Action(out["category"][i], out["input"][i], int(out["device"][i]), out["action"][i], float(out["delta_kg"][i]))
+        for i in order
+    ]
+
+
+# --- Controllo su engine (CLI)
+
+def _perturb(a: Answers, row) -> Answers:
+    """Le stesse risposte con il passo di `row` applicato, per rieseguire il modello."""
+    import copy
+
+    a = copy.deepcopy(a)
+    if row.device >= 0:
+        d = a.devices[row.device]
+        if row.category == "Devices":
+            d.years = float(d.years) + YEARS_STEP
+        else:
+            d.eol = row.action.removeprefix("End of life: ")
+    elif row.input in a.activity_hours and row.category == "Digital Activities":
+        a.activity_hours[row.input] -= min(HOURS_STEP, a.activity_hours[row.input])
+    elif row.category == "AI Tools":
+        a.ai_queries[row.input] -= min(AI_STEP, a.ai_queries[row.input])
+    elif row.input == "Wi-Fi":
+        a.wifi_hours -= min(HOURS_STEP, a.wifi_hours)
+    elif row.input == "Printing":
+        a.pages -= min(PAGES_STEP, a.pages)
+    elif row.input == "Computer left on":
+        a.idle = "I turn it off"
+    else:
+        attr = {"Emails without attachments": "email_plain", "Emails with attachments": "email_attach",
+                "Cloud storage": "cloud"}[row.input]
+        setattr(a, attr, row.action.removeprefix("Down to "))
+    return a
+
+
+if __name__ == "__main__":
+    import random
+
+    import engine
+
+    parser = argparse.ArgumentParser(description="Marginal savings of every answer, vectorised.")
+    parser.add_argument("--synthetic", type=int, metavar="N", default=100000, help="number of random responses")
+    args = parser.parse_args()
+
+    fs = factors.current()
+    rng = random.Random(0)
+    answers = {i: batch._random_answers(rng, rng.randint(1, 4)) for i in range(args.synthetic)}
+    frames = batch.answers_to_frames(answers)
+
+    t0 = time.perf_counter()
+    sens = sensitivity_frame(*frames, fs)
+    seconds = time.perf_counter() - t0
+    print(f"{len(sens):,} steps for {args.synthetic:,} respondents in {seconds:.2f}s "
+          f"({args.synthetic / seconds:,.0f} respondents/s)")
+
+    checked = 0
+    for row in sens[sens["respondent"] < 200].itertuples():
+        a = answers[row.respondent]
+        expected = engine.compute_footprint(_perturb(a, row), fs).total - engine.compute_footprint(a, fs).total
+        assert abs(row.delta_kg - expected) < 1e-6, (row, expected)
+        checked += 1
+    print(f"{checked:,} steps match engine.compute_footprint")
+
+    savings = sens[sens["delta_kg"] < 0]
+    summary = savings.groupby(["input", "action"])["delta_kg"].agg(["count", "mean"])
+    print(summary.sort_values("mean").head(15).to_string())
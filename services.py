@@ -0,0 +1,146 @@
+"""
+Risorse condivise da tutte le sessioni (cache, coda di scrittura, immagini).
+
+I moduli pesanti (gspread via `sheets`, Pillow via `assets`, pandas/numpy via
+`answer_cache`) vengono importati solo alla prima chiamata che ne ha bisogno.
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import streamlit as st
+
+from aggregates import RoleAggregates
+from role_stats import RoleStatsCache
+from storage import RESULT_COLUMNS, StorageBackend, from_env
+from writer import WriteBehindQueue
+
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@st.cache_resource
+def role_aggregates() -> RoleAggregates:
+    """Count/media/varianza/mediana per ruolo e categoria, aggiornati a ogni batch salvato."""
+    return RoleAggregates(os.environ.get("AGGREGATES_PATH", os.path.join(APP_DIR, "aggregates.json")))
+
+
+@st.cache_resource
+def background() -> ThreadPoolExecutor:
+    """Pool condiviso per il lavoro che le pagine non devono aspettare (lookup remoti)."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="background")
+
+
+@st.cache_resource
+def warm_assets():
+    """Prepara le varianti ridimensionate delle immagini una volta per processo, senza bloccare l'avvio."""
+    def _warm():
+        import assets
+        assets.warm()
+
+    threading.Thread(target=_warm, name="warm-assets", daemon=True).start()
+
+
+def show_image(name: str, width: int, page: str):
+    import assets
+
+    data = assets.image_bytes(name, width)
+    assets.record_served(page, len(data))
+    st.image(data, width=width)
+
+
+@st.cache_resource
+def answer_cache():
+    """Footprint, consigli e virtù per combinazione di risposte, condivisi da tutte le sessioni."""
+    from answer_cache import AnswerCache
+
+    return AnswerCache(int(os.environ.get("ANSWER_CACHE_SIZE", 4096)))
+
+
+@st.cache_resource
+def storage() -> StorageBackend:
+    """Backend dei risultati scelto con STORAGE_BACKEND (sheets, sqlite, memory)."""
+    return from_env()
+
+
+@st.cache_resource
+def result_writer() -> WriteBehindQueue:
+    """Coda di scrittura condivisa da tutte le sessioni; lo spool sopravvive ai riavvii."""
+    spool = os.environ.get("RESULTS_SPOOL", os.path.join(APP_DIR, "results_spool.jsonl"))
+    return WriteBehindQueue(storage().append_results, spool, RESULT_COLUMNS, on_written=role_aggregates().add_rows).start()
+
+
+def save_row(submission_id, role, co2_devices, co2_ewaste, co2_ai, co2_digital, co2_total,
+             answers: dict | None = None, factor_version: int | None = None):
+    """Accoda la riga senza bloccare; False se questa submission è già stata salvata.
+
+    `answers` è la forma compatta di schema.encode_answers(): viene salvata
+    insieme ai totali così che rescore.py possa ricalcolarli con altri fattori.
+    """
+    # restituisce numeri (float), non stringhe
+    def norm_val(x):
+        try:
+            v = float(x)
+            if abs(v) < 1e-12:
+                return 0.0
+            # arrotonda ma resta numero
+            return round(v, 6)
+        except Exception:
+            return 0.0
+
+    payload = {
+        "Role": str(role or ""),
+        "CO2 Devices": norm_val(co2_devices),
+        "CO2 E-Waste": norm_val(co2_ewaste),
+        "CO2 AI": norm_val(co2_ai),
+        "CO2 Digital Activities": norm_val(co2_digital),
+        "CO2 Total": norm_val(co2_total),
+        "Factor Version": int(factor_version or 0),
+        "Submitted At": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "Submission ID": str(submission_id),
+        "Answers": json.dumps(answers, separators=(",", ":")) if answers else "",
+    }
+    return result_writer().submit(submission_id, payload)
+
+
+@st.cache_resource
+def results_mirror():
+    """Copia locale incrementale dei risultati: ogni aggiornamento legge solo le righe nuove."""
+    from mirror import ResultsMirror
+
+    return ResultsMirror(storage(), os.environ.get("MIRROR_PATH", os.path.join(APP_DIR, "results_mirror.jsonl")))
+
+
+@st.cache_resource
+def role_stats_cache() -> RoleStatsCache:
+    """Medie per ruolo dal mirror, condivise da tutte le sessioni (TTL da ROLE_STATS_TTL, in secondi)."""
+    return RoleStatsCache(results_mirror().fetch_role_stats, ttl=float(os.environ.get("ROLE_STATS_TTL", 300)))
+
+
+def role_avg_lookup():
+    """
+    Funzione role -> (avg, count), oppure (None, None) se non disponibile.
+
+    Con un backend indicizzato (SQLite) è una query diretta, sempre aggiornata;
+    altrimenti si legge il tab 'Stats' tramite la cache condivisa. Le risorse
+    sono risolte qui, quindi la funzione si può chiamare da un altro thread.
+    """
+    backend = storage()
+    read = backend.role_avg if backend.indexed_stats else role_stats_cache().get
+
+    def lookup(role: str):
+        try:
+            return read(role)
+        except Exception:
+            return None, None
+    return lookup
+
+
+def get_avg_for_role_from_stats(role: str):
+    """Ritorna (avg, count) per il ruolo, oppure (None, None) se non disponibile."""
+    try:
+        return role_avg_lookup()(role)
+    except Exception:
+        return None, None
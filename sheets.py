@@ -0,0 +1,108 @@
+"""
+Accesso al Google Sheet dei risultati (usato da storage.SheetsBackend).
+
+Credenziali e chiave del foglio arrivano da `st.secrets`:
+  [gcp_service_account]  -> JSON del service account
+  sheet_id = "..."       -> chiave del foglio
+
+Client autorizzato, sessione HTTP (keep-alive) e handle del foglio sono
+creati una volta per processo e condivisi da tutte le sessioni. Ogni
+richiesta ha un timeout (SHEETS_TIMEOUT_S, lettura; la connessione ha 3 s).
+"""
+import os
+
+import gspread
+import requests
+import streamlit as st
+from google.oauth2.service_account import Credentials
+
+from storage import RESCORED_TAB, RESULT_COLUMNS, STATS_TAB
+
+
+SCOPES = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive",
+]
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = float(os.environ.get("SHEETS_TIMEOUT_S", 10))
+POOL_SIZE = 8
+
+
+@st.cache_resource
+def client() -> gspread.Client:
+    # credenziali google-auth: gspread 6 le avvolge in una AuthorizedSession
+    creds = Credentials.from_service_account_info(dict(st.secrets["gcp_service_account"]), scopes=SCOPES)
+    gc = gspread.authorize(creds)
+    # AuthorizedSession è un requests.Session: un pool di connessioni keep-alive per tutto il processo
+    gc.http_client.session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=POOL_SIZE))
+    gc.set_timeout((CONNECT_TIMEOUT, READ_TIMEOUT))
+    return gc
+
+
+@st.cache_resource
+def open_spreadsheet() -> gspread.Spreadsheet:
+    return client().open_by_key(st.secrets["sheet_id"])
+
+
+@st.cache_resource
+def open_worksheet(name: str) -> gspread.Worksheet:
+    return open_spreadsheet().worksheet(name)
+
+
+@st.cache_resource
+def results_sheet() -> gspread.Worksheet:
+    """Primo tab; `Spreadsheet.sheet1` rilegge i metadati a ogni accesso."""
+    return open_spreadsheet().sheet1
+
+
+def fetch_role_stats() -> list[dict]:
+    """Righe del tab 'Stats' (Role, AvgCO2, Count)."""
+    return open_worksheet(STATS_TAB).get_all_records()
+
+
+def append_results(rows: list[list]):
+    """Una sola chiamata API per tutte le righe del batch."""
+    results_sheet().append_rows(rows, value_input_option="RAW")
+
+
+def iter_result_rows(chunk_size: int = 1000):
+    """Righe del foglio risultati come dict, lette a blocchi di `chunk_size`."""
+    ws = results_sheet()
+    header = ws.row_values(1)
+    last_col = gspread.utils.rowcol_to_a1(1, len(header)).rstrip("1")
+    start = 2
+    while True:
+        values = ws.get(f"A{start}:{last_col}{start + chunk_size - 1}")
+        if not values:
+            return
+        yield [dict(zip(header, row)) for row in values]
+        if len(values) < chunk_size:
+            return
+        start += chunk_size
+
+
+def read_rows(start: int, limit: int) -> list[list]:
+    """Righe di dati da `start` (0 = la prima dopo l'intestazione), al massimo `limit`."""
+    last_col = gspread.utils.rowcol_to_a1(1, len(RESULT_COLUMNS)).rstrip("1")
+    return results_sheet().get(f"A{start + 2}:{last_col}{start + 1 + limit}")
+
+
+def append_rescored(version: int, rows: list[list]):
+    """Scrive righe ricalcolate nel tab della versione (creato se manca)."""
+    sh = open_spreadsheet()
+    title = RESCORED_TAB.format(version=version)
+    try:
+        ws = sh.worksheet(title)
+    except gspread.WorksheetNotFound:
+        ws = sh.add_worksheet(title, rows=1, cols=len(RESULT_COLUMNS))
+        ws.append_row(RESULT_COLUMNS, value_input_option="RAW")
+    ws.append_rows(rows, value_input_option="RAW")
+
+
+def rescored_ids(version: int) -> set[str]:
+    """Submission ID già presenti nel tab della versione (vuoto se il tab non esiste)."""
+    try:
+        ws = open_spreadsheet().worksheet(RESCORED_TAB.format(version=version))
+    except gspread.WorksheetNotFound:
+        return set()
+    return set(ws.col_values(RESULT_COLUMNS.index("Submission ID") + 1)[1:])
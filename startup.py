@@ -0,0 +1,79 @@
+"""
+Tempi di import per tenere d'occhio l'avvio a freddo.
+
+Il router importa ogni pagina con `timed_import()` solo quando ci arriva la
+prima volta; il tempo di ogni import (dipendenze incluse) viene registrato
+una volta per processo e stampato su stderr.
+
+    python startup.py    # import a freddo di ogni modulo, ognuno in un processo nuovo
+"""
+import importlib
+import subprocess
+import sys
+import threading
+import time
+
+
+_lock = threading.Lock()
+IMPORT_TIMES = {}   # nome -> ms
+
+
+def record(name: str, ms: float):
+    with _lock:
+        if name in IMPORT_TIMES:
+            return
+        IMPORT_TIMES[name] = ms
+    print(f"[startup] {name}: {ms:.1f} ms", file=sys.stderr)
+
+
+def timed_import(name: str):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    t0 = time.perf_counter()
+    module = importlib.import_module(name)
+    record(f"import {name}", (time.perf_counter() - t0) * 1000)
+    return module
+
+
+def import_times() -> dict:
+    with _lock:
+        return dict(IMPORT_TIMES)
+
+
+MODULES = [
+    "streamlit",
+    "pandas",
+    "plotly.express",
+    "gspread",
+    "PIL.Image",
+    "services",
+    "views.intro",
+    "views.main",
+    "views.guess",
+    "views.results_cards",
+    "views.results_breakdown",
+    "views.results_equiv",
+    "views.virtues",
+    "views.final",
+]
+
+
+def _cold_import_ms(name: str, baseline: str = "streamlit") -> float:
+    # ogni misura parte da un processo nuovo con streamlit già importato,
+    # come succede al server quando il router carica una pagina
+    code = (
+        "import time, importlib\n"
+        f"importlib.import_module({baseline!r})\n"
+        "t0 = time.perf_counter()\n"
+        f"importlib.import_module({name!r})\n"
+        "print((time.perf_counter() - t0) * 1000)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip())
+
+
+if __name__ == "__main__":
+    for name in MODULES:
+        baseline = "sys" if name == "streamlit" else "streamlit"
+        print(f"{name:28} {_cold_import_ms(name, baseline):8.1f} ms")
@@ -0,0 +1,561 @@
+"""
+Backend di salvataggio dei risultati, scelto con la variabile STORAGE_BACKEND:
+
+  sheets  -> Google Sheet (default, credenziali in st.secrets)
+  sqlite  -> file SQLite locale (SQLITE_PATH), in WAL, con indici per ruolo,
+             data e versione dei fattori
+  memory  -> finto Google Sheet in memoria, con latenza e quota al minuto
+             simili a quelle di Sheets, per i test di carico senza credenziali
+
+I backend remoti (sheets, memory) sono avvolti in GuardedBackend: scritture
+cadenzate sotto la quota, circuit breaker e istogrammi di latenza.
+
+Ogni backend espone le stesse operazioni, usate da services e rescore.py:
+  append_results(rows)              righe nell'ordine di RESULT_COLUMNS
+  fetch_role_stats()                righe come il tab 'Stats' (Role, AvgCO2, Count)
+  iter_result_rows(chunk_size)      righe salvate come dict, a blocchi
+  read_rows(start, limit)           righe salvate come liste, dalla riga `start` (0 = prima)
+  append_rescored(version, rows)    totali ricalcolati per una versione dei fattori
+  rescored_ids(version)             Submission ID già ricalcolati per quella versione
+
+    python storage.py --backend memory    # throughput di scrittura e latenza delle statistiche
+"""
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from resilience import CircuitBreaker, LatencyHistogram, TokenBucket
+
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STATS_TAB = "Stats"
+
+# Colonne del foglio risultati (primo tab), nell'ordine in cui vengono scritte.
+# Le ultime quattro permettono di ricalcolare i totali con altri fattori:
+# "Answers" è il JSON compatto di schema.encode_answers().
+RESULT_COLUMNS = [
+    "Role",
+    "CO2 Devices",
+    "CO2 E-Waste",
+    "CO2 AI",
+    "CO2 Digital Activities",
+    "CO2 Total",
+    "Factor Version",
+    "Submitted At",
+    "Submission ID",
+    "Answers",
+]
+# tab con i totali ricalcolati per una versione dei fattori
+RESCORED_TAB = "Results v{version}"
+
+
+class StorageBackend:
+    name = "base"
+    # True se role_avg() è una query abbastanza economica da farla a ogni lettura
+    indexed_stats = False
+
+    def append_results(self, rows: list[list]):
+        raise NotImplementedError
+
+    def fetch_role_stats(self) -> list[dict]:
+        raise NotImplementedError
+
+    def iter_result_rows(self, chunk_size: int = 1000):
+        raise NotImplementedError
+
+    def read_rows(self, start: int, limit: int) -> list[list]:
+        raise NotImplementedError
+
+    def append_rescored(self, version: int, rows: list[list]):
+        raise NotImplementedError
+
+    def rescored_ids(self, version: int) -> set[str]:
+        raise NotImplementedError
+
+    def role_avg(self, role: str) -> tuple[float | None, int | None]:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+def role_stats_from_rows(rows) -> list[dict]:
+    """Stesse righe del tab 'Stats' (media di CO2 Total per ruolo), calcolate dai risultati."""
+    sums = {}
+    for row in rows:
+        role = str(row[0] or "").strip()
+        try:
+            total = float(row[5])
+        except (TypeError, ValueError):
+            continue
+        if role:
+            s = sums.setdefault(role, [0.0, 0])
+            s[0] += total
+            s[1] += 1
+    return [{"Role": r, "AvgCO2": t / n, "Count": n} for r, (t, n) in sums.items()]
+
+
+# --- Google Sheets
+
+class SheetsBackend(StorageBackend):
+    name = "sheets"
+
+    def append_results(self, rows):
+        import sheets
+        sheets.append_results(rows)
+
+    def fetch_role_stats(self):
+        import sheets
+        return sheets.fetch_role_stats()
+
+    def iter_result_rows(self, chunk_size=1000):
+        import sheets
+        return sheets.iter_result_rows(chunk_size)
+
+    def read_rows(self, start, limit):
+        import sheets
+        return sheets.read_rows(start, limit)
+
+    def append_rescored(self, version, rows):
+        import sheets
+        sheets.append_rescored(version, rows)
+
+    def rescored_ids(self, version):
+        import sheets
+        return sheets.rescored_ids(version)
+
+
+# --- SQLite
+
+SQL_COLUMNS = [
+    "role", "co2_devices", "co2_ewaste", "co2_ai", "co2_digital", "co2_total",
+    "factor_version", "submitted_at", "submission_id", "answers",
+]
+_SQL_TYPES = ["TEXT", "REAL", "REAL", "REAL", "REAL", "REAL", "INTEGER", "TEXT", "TEXT", "TEXT"]
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Tabella `results` per le risposte, `rescored` per i totali ricalcolati.
+
+    Il database è in WAL: le letture non aspettano la scrittura in corso. Ogni
+    thread (sessioni, coda write-behind, rescore) usa la propria connessione e
+    ogni batch della coda è un solo INSERT multiplo in una transazione.
+    L'indice (role, co2_total) copre le medie per ruolo, che quindi non
+    leggono la tabella.
+    """
+    name = "sqlite"
+    indexed_stats = True
+
+    INDEXES = [
+        "CREATE INDEX IF NOT EXISTS results_role ON results (role, co2_total)",
+        "CREATE INDEX IF NOT EXISTS results_submitted ON results (submitted_at)",
+        "CREATE INDEX IF NOT EXISTS results_version ON results (factor_version)",
+        "CREATE INDEX IF NOT EXISTS rescored_version ON rescored (factor_version, role)",
+    ]
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        columns = ", ".join(f"{c} {t}" for c, t in zip(SQL_COLUMNS, _SQL_TYPES))
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")  # resta impostato nel file
+        with conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS results ({columns})")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS rescored ({columns})")
+            for sql in self.INDEXES:
+                conn.execute(sql)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")  # in WAL resta consistente anche dopo un crash
+            self._local.conn = conn
+        return conn
+
+    def _insert(self, table: str, rows):
+        marks = ", ".join("?" * len(SQL_COLUMNS))
+        conn = self._conn()
+        with conn:
+            conn.executemany(f"INSERT INTO {table} ({', '.join(SQL_COLUMNS)}) VALUES ({marks})", rows)
+
+    def append_results(self, rows):
+        self._insert("results", rows)
+
+    def fetch_role_stats(self):
+        cur = self._conn().execute(
+            "SELECT role, AVG(co2_total), COUNT(co2_total) FROM results WHERE role != '' GROUP BY role")
+        return [{"Role": r, "AvgCO2": avg, "Count": n} for r, avg, n in cur]
+
+    def role_avg(self, role, since: str | None = None, factor_version: int | None = None):
+        """(avg, count) di CO2 Total per il ruolo, opzionalmente dal giorno `since` (ISO) o per versione."""
+        sql = "SELECT AVG(co2_total), COUNT(co2_total) FROM results WHERE role = ?"
+        params = [(role or "").strip()]
+        if since is not None:
+            sql += " AND submitted_at >= ?"
+            params.append(since)
+        if factor_version is not None:
+            sql += " AND factor_version = ?"
+            params.append(factor_version)
+        avg, n = self._conn().execute(sql, params).fetchone()
+        return (avg, n) if n else (None, None)
+
+    def iter_result_rows(self, chunk_size=1000):
+        cur = self._conn().execute(f"SELECT {', '.join(SQL_COLUMNS)} FROM results ORDER BY rowid")
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield [dict(zip(RESULT_COLUMNS, row)) for row in rows]
+
+    def read_rows(self, start, limit):
+        cur = self._conn().execute(
+            f"SELECT {', '.join(SQL_COLUMNS)} FROM results ORDER BY rowid LIMIT ? OFFSET ?", (limit, start))
+        return [list(row) for row in cur]
+
+    def append_rescored(self, version, rows):
+        self._insert("rescored", rows)
+
+    def rescored_ids(self, version):
+        cur = self._conn().execute("SELECT submission_id FROM rescored WHERE factor_version = ?", (version,))
+        return {row[0] for row in cur}
+
+
+# --- Finto Google Sheet in memoria
+
+class QuotaExceeded(Exception):
+    """Come l'errore 429 di Sheets: troppe richieste nell'ultimo minuto."""
+
+
+class FakeSheetsBackend(StorageBackend):
+    """
+    Si comporta come il foglio vero visto dall'app: ogni chiamata è una
+    richiesta API con latenza log-normale (mediana `latency_ms`) e al massimo
+    `quota_per_minute` letture e altrettante scritture in una finestra di
+    `window` secondi; oltre, solleva QuotaExceeded senza fare nulla, come fa
+    Sheets. Con `timeout`, le richieste più lente falliscono con TimeoutError.
+    """
+    name = "memory"
+
+    def __init__(self, latency_ms: float = 400.0, jitter: float = 0.4, quota_per_minute: int = 60,
+                 window: float = 60.0, seed: int | None = None, timeout: float | None = None):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.quota_per_minute = quota_per_minute
+        self.window = window
+        self.timeout = timeout
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._calls = {"read": deque(), "write": deque()}   # istanti delle richieste nella finestra
+        self._rows = []
+        self._rescored = {}         # versione -> righe
+
+        self.requests = 0
+        self.quota_errors = 0
+
+    def _request(self, kind: str = "read"):
+        with self._lock:
+            now = time.monotonic()
+            calls = self._calls[kind]
+            while calls and now - calls[0] >= self.window:
+                calls.popleft()
+            if len(calls) >= self.quota_per_minute:
+                self.quota_errors += 1
+                raise QuotaExceeded(f"{kind} quota of {self.quota_per_minute} requests per {self.window:g}s exceeded")
+            calls.append(now)
+            self.requests += 1
+            delay = self.latency_ms / 1000 * self._rng.lognormvariate(0.0, self.jitter)
+        if self.timeout is not None and delay > self.timeout:
+            time.sleep(self.timeout)
+            raise TimeoutError(f"{kind} timed out after {self.timeout:g}s")
+        time.sleep(delay)
+
+    def reset_quota(self):
+        with self._lock:
+            for calls in self._calls.values():
+                calls.clear()
+
+    def append_results(self, rows):
+        self._request("write")
+        with self._lock:
+            self._rows.extend(list(r) for r in rows)
+
+    def fetch_role_stats(self):
+        self._request()
+        with self._lock:
+            rows = list(self._rows)
+        return role_stats_from_rows(rows)
+
+    def iter_result_rows(self, chunk_size=1000):
+        start = 0
+        while True:
+            self._request()
+            with self._lock:
+                rows = self._rows[start:start + chunk_size]
+            if not rows:
+                return
+            yield [dict(zip(RESULT_COLUMNS, row)) for row in rows]
+            start += chunk_size
+
+    def read_rows(self, start, limit):
+        self._request()
+        with self._lock:
+            return [list(r) for r in self._rows[start:start + limit]]
+
+    def append_rescored(self, version, rows):
+        self._request("write")
+        with self._lock:
+            self._rescored.setdefault(version, []).extend(list(r) for r in rows)
+
+    def rescored_ids(self, version):
+        self._request()
+        i = RESULT_COLUMNS.index("Submission ID")
+        with self._lock:
+            return {str(r[i]) for r in self._rescored.get(version, [])}
+
+
+# --- Protezioni per i backend remoti
+
+class GuardedBackend(StorageBackend):
+    """
+    Avvolge un backend remoto. Le scritture prendono un token da un bucket
+    tarato sotto la quota al minuto (aspettando al massimo `write_wait`
+    secondi). Ogni chiamata passa dal circuit breaker: se il backend sta
+    fallendo, fallisce subito con CircuitOpen invece di aspettare il timeout,
+    e chi legge le medie ripiega su AVERAGE_CO2_BY_ROLE. La latenza di ogni
+    operazione finisce in un istogramma.
+    """
+
+    def __init__(self, inner: StorageBackend, writes_per_minute: float = 50, burst: int = 5,
+                 failures: int = 5, reset_after: float = 30.0, write_wait: float = 120.0):
+        self.inner = inner
+        self.name = inner.name
+        self.indexed_stats = inner.indexed_stats
+        self.bucket = TokenBucket(writes_per_minute / 60, burst)
+        self.breaker = CircuitBreaker(failures, reset_after)
+        self.write_wait = write_wait
+        self._lock = threading.Lock()
+        self._latency = {}          # operazione -> LatencyHistogram
+
+    def _histogram(self, op: str) -> LatencyHistogram:
+        with self._lock:
+            h = self._latency.get(op)
+            if h is None:
+                h = self._latency[op] = LatencyHistogram()
+            return h
+
+    def _call(self, op: str, fn, *args, write: bool = False):
+        self.breaker.before()
+        if write and not self.bucket.acquire(self.write_wait):
+            # niente esito sul backend: non deve restare una prova half-open appesa
+            self.breaker.release()
+            raise TimeoutError(f"{op}: no write slot within {self.write_wait:g}s")
+        t0 = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception:
+            self._histogram(op).observe((time.perf_counter() - t0) * 1000, error=True)
+            self.breaker.failure()
+            raise
+        self._histogram(op).observe((time.perf_counter() - t0) * 1000)
+        self.breaker.success()
+        return result
+
+    def append_results(self, rows):
+        self._call("append_results", self.inner.append_results, rows, write=True)
+
+    def fetch_role_stats(self):
+        return self._call("fetch_role_stats", self.inner.fetch_role_stats)
+
+    def iter_result_rows(self, chunk_size=1000):
+        chunks = iter(self.inner.iter_result_rows(chunk_size))
+        while True:
+            chunk = self._call("iter_result_rows", next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    def read_rows(self, start, limit):
+        return self._call("read_rows", self.inner.read_rows, start, limit)
+
+    def append_rescored(self, version, rows):
+        self._call("append_rescored", self.inner.append_rescored, version, rows, write=True)
+
+    def rescored_ids(self, version):
+        return self._call("rescored_ids", self.inner.rescored_ids, version)
+
+    def role_avg(self, role):
+        return self._call("role_avg", self.inner.role_avg, role)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latency = {op: h.snapshot() for op, h in self._latency.items()}
+        return {
+            "backend": self.name,
+            "circuit": self.breaker.state,
+            "circuit_opened": self.breaker.opened,
+            "circuit_rejected": self.breaker.rejected,
+            "write_wait_s": round(self.bucket.waited_s, 2),
+            "latency_ms": latency,
+        }
+
+
+def guarded(inner: StorageBackend) -> GuardedBackend:
+    return GuardedBackend(
+        inner,
+        writes_per_minute=float(os.environ.get("STORAGE_WRITES_PER_MIN", 50)),
+        failures=int(os.environ.get("BREAKER_FAILURES", 5)),
+        reset_after=float(os.environ.get("BREAKER_RESET_S", 30)),
+    )
+
+
+def from_env(name: str | None = None) -> StorageBackend:
+    name = name or os.environ.get("STORAGE_BACKEND", "sheets")
+    if name == "sheets":
+        return guarded(SheetsBackend())
+    if name == "sqlite":
+        return SQLiteBackend(os.environ.get("SQLITE_PATH", os.path.join(APP_DIR, "results.db")))
+    if name == "memory":
+        return guarded(FakeSheetsBackend(
+            latency_ms=float(os.environ.get("FAKE_SHEETS_LATENCY_MS", 400)),
+            quota_per_minute=int(os.environ.get("FAKE_SHEETS_QUOTA", 60)),
+            timeout=float(os.environ.get("STORAGE_TIMEOUT_S", 10)),
+        ))
+    raise ValueError(f"unknown STORAGE_BACKEND: {name!r}")
+
+
+# --- Benchmark
+
+def _percentiles(values: list[float]) -> str:
+    if not values:
+        return "n/a"
+    v = sorted(values)
+    pick = lambda q: v[min(len(v) - 1, int(q * len(v)))]
+    return f"p50 {pick(0.5):7.1f}  p95 {pick(0.95):7.1f}  p99 {pick(0.99):7.1f}  max {v[-1]:7.1f} ms"
+
+
+def _run_threads(n: int, target):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def benchmark(backend: StorageBackend, rows: int, sessions: int, reads: int, batch_size: int):
+    import tempfile
+
+    from role_stats import RoleStatsCache
+    from writer import WriteBehindQueue
+
+    rng = random.Random(0)
+    roles = ["Student", "Professor", "Staff Member"]
+
+    # scrittura: `sessions` thread che salvano come farebbero le sessioni, tramite la coda write-behind
+    spool = os.path.join(tempfile.mkdtemp(), "spool.jsonl")
+    queue = WriteBehindQueue(backend.append_results, spool, RESULT_COLUMNS, batch_size=batch_size,
+                             flush_interval=0.2, backoff_base=0.5, backoff_max=10.0).start()
+    submit_ms = []
+
+    def write(i):
+        for j in range(i, rows, sessions):
+            row = {"Role": rng.choice(roles), "CO2 Total": round(rng.uniform(50, 900), 6), "Submission ID": f"bench-{j}"}
+            t0 = time.perf_counter()
+            queue.submit(row["Submission ID"], row)
+            submit_ms.append((time.perf_counter() - t0) * 1000)
+
+    fake = getattr(backend, "inner", backend)
+    if isinstance(fake, FakeSheetsBackend):
+        fake.reset_quota()
+    t0 = time.perf_counter()
+    _run_threads(sessions, write)
+    drained = queue.flush(timeout=600)
+    elapsed = time.perf_counter() - t0
+    qs = queue.stats()
+    print(f"write  {qs['written']:,}/{rows:,} rows in {elapsed:.2f}s = {qs['written'] / elapsed:,.1f} rows/s "
+          f"({qs['batches']} batches, {qs['failures']} failed attempts{'' if drained else ', NOT drained'})")
+    print(f"submit {_percentiles(submit_ms)}")
+
+    # lettura delle statistiche: diretta (una richiesta per lettura) e tramite la cache condivisa
+    readers = [("direct", backend.fetch_role_stats),
+               ("cached", lambda c=RoleStatsCache(backend.fetch_role_stats, ttl=300): c.get("Student"))]
+    if backend.indexed_stats:
+        readers.append(("index", lambda: backend.role_avg("Student")))
+    for label, read in readers:
+        if isinstance(fake, FakeSheetsBackend):
+            fake.reset_quota()   # ogni fase parte con la quota piena e il circuito chiuso
+        if isinstance(backend, GuardedBackend):
+            backend.breaker.reset()
+        lat, errors = [], [0]
+
+        def reader(i):
+            for _ in range(i, reads, sessions):
+                t0 = time.perf_counter()
+                try:
+                    read()
+                except Exception:
+                    errors[0] += 1
+                    continue
+                lat.append((time.perf_counter() - t0) * 1000)
+
+        _run_threads(sessions, reader)
+        print(f"stats  {label:6} {_percentiles(lat)}  ({errors[0]} errors)")
+
+    if isinstance(fake, FakeSheetsBackend):
+        print(f"fake sheets: {fake.requests} requests, {fake.quota_errors} quota errors")
+    for op, h in backend.stats().get("latency_ms", {}).items():
+        print(f"{op:16} n={h['count']:<5} errors={h['errors']:<4} p50<={h['p50_ms']} p95<={h['p95_ms']} p99<={h['p99_ms']} ms")
+
+
+def check_breaker():
+    """Half-open con il bucket esaurito: la scrittura di prova scade, il circuito deve potersi richiudere."""
+    backend = GuardedBackend(FakeSheetsBackend(latency_ms=0, jitter=0, seed=0),
+                             writes_per_minute=600, burst=1, failures=1, reset_after=0.05, write_wait=0)
+    backend.append_results([{"Submission ID": "check-0"}])     # consuma l'unico token
+    backend.breaker.failure()                                   # circuito aperto
+    time.sleep(0.06)
+    try:
+        backend.append_results([{"Submission ID": "check-1"}])  # prova half-open senza token
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("expected TimeoutError with an empty bucket")
+    assert backend.breaker.state == "half-open", backend.breaker.state
+    time.sleep(0.11)                                            # token di nuovo disponibile
+    backend.append_results([{"Submission ID": "check-2"}])
+    assert backend.breaker.state == "closed", backend.breaker.state
+    print("breaker: half-open probe without a write slot released, circuit closed again")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark a storage backend under simulated load.")
+    parser.add_argument("--backend", default="memory", choices=["memory", "sqlite", "sheets"])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent writer/reader threads")
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="memory backend only")
+    parser.add_argument("--quota", type=int, default=60, help="memory backend only: requests per minute")
+    parser.add_argument("--check", action="store_true", help="only check the circuit breaker edge cases")
+    args = parser.parse_args()
+
+    if args.check:
+        check_breaker()
+        raise SystemExit(0)
+
+    if args.backend == "memory":
+        backend = guarded(FakeSheetsBackend(latency_ms=args.latency_ms, quota_per_minute=args.quota, seed=0))
+    elif args.backend == "sqlite" and "SQLITE_PATH" not in os.environ:
+        import tempfile
+        backend = SQLiteBackend(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    else:
+        backend = from_env(args.backend)
+    print(f"backend: {backend.name}")
+    benchmark(backend, args.rows, args.sessions, args.reads, args.batch_size)
@@ -0,0 +1,147 @@
+"""
+Consigli personalizzati e "virtù" mostrati nella pagina dei tips.
+
+I consigli generici sono per categoria; quelli personalizzati e le virtù sono
+regole dichiarative (rules.Rule) sulle feature di rules.feature_frame,
+compilate una volta per processo in `RULES`. `evaluate()` le valuta per un
+utente, `RULES.trigger_rates()` su un DataFrame di rispondenti.
+"""
+import random
+
+import rules
+from engine import Answers
+from factors import FactorSet
+from rules import Rule
+
+
+# === 1) GENERIC (evergreen) TIPS, per categoria ===
+GENERIC_TIPS = {
+    "Devices": [
+        "<b>Update software regularly.</b> This enhances efficiency and performance, often reducing energy consumption.",
+        "<b>Activate power-saving settings, reduce screen brightness and enable dark mode.</b> This lowers energy use.",
+        "<b>Choose accessories made from recycled or sustainable materials.</b> This minimizes the environmental impact of your tech choices."
+    ],
+    "E-Waste": [
+        "<b>Repair instead of replacing.</b> Fix broken electronics whenever possible to avoid unnecessary waste."
+    ],
+    "Digital Activities": [
+        "<b>Use your internet mindfully:</b> close unused apps, avoid sending large attachments, and turn off video during calls when not essential."
+    ],
+    "Artificial Intelligence": [
+        "<b>Use search engines for simple tasks: </b> They consume far less energy than AI tools.",
+        "<b>Disable AI-generated results in search engines</b> (e.g., on Bing: go to Settings > Search > Uncheck \"Include AI-powered answers\" or similar option).",
+        "<b>Prefer smaller AI models when possible.</b> For basic tasks, use lighter versions like GPT-4o-mini instead of more energy-intensive models.",
+        "<b>Be concise in AI prompts and require concise answers:</b> short inputs and outputs require less processing."
+    ]
+}
+
+# === 2) PERSONALIZED TIPS, nell'ordine in cui vengono mostrati per categoria
+TIP_RULES = [
+    # --- Devices
+    Rule("devices_new_pc", "Devices", (("new_pc_saving", ">", 0),),
+         "<b>You bought a new {new_pc_noun}: next time consider choosing a used or refurbished one.</b> "
+         "You could save about {new_pc_saving:kg} kg CO₂e/year (vs a new device with the same usage)."),
+    Rule("devices_extend_life", "Devices", (("extend_saving", ">", 0),),
+         "<b>You plan to use your {extend_kind} for {extend_years:.0f} years.</b> "
+         "if you extend it to {extend_years_after:.0f}, you could save about {extend_saving:kg} kg CO₂e/year."),
+    # --- E-Waste
+    Rule("ewaste_stored_at_home", "E-Waste", (("stored_kinds", "!=", ""), ("stored_saving_max", ">", 0)),
+         "<b>You have {stored_kinds} stored at home.</b> Recycling or reusing them could save between "
+         "{stored_saving_min:kg} and {stored_saving_max:kg} kg CO₂e/year. Don’t let them gather dust!"),
+    Rule("ewaste_general_trash", "E-Waste", (("trash_kinds", "!=", ""), ("trash_saving", ">", 0)),
+         "<b>You throw {trash_kinds} away in general waste. this prevents proper recycling or reuse.</b> "
+         "Bringing it to a certified collection point could save about {trash_saving:kg} kg CO₂e/year."),
+    # --- Digital Activities
+    Rule("cloud_storage", "Digital Activities", (("cloud_gb", ">", 50),),
+         "<b>At the moment, your annual footprint from stored data is {cloud_impact:kg} kg CO₂e/year.</b> "
+         "Try to declutter your digital space by regularly deleting unnecessary files and emptying trash and "
+         "spam folders to reduce digital pollution."),
+    Rule("emails_with_attachments", "Digital Activities", (("em_attach", ">", 10),),
+         "<b>Currently, your emails with attachments emit around {em_attach_impact:kg} kg CO₂e/year.</b> "
+         "Try sharing links to OneDrive or Google Drive instead of large attachments."),
+    Rule("idle_left_on", "Digital Activities", (("idle_left_on", "==", True),),
+         "<b>You usually leave your computer on in idle mode. </b> Turning it off at the end of the day could "
+         "save up to {idle_saving:kg} kg CO₂e/year and extend its lifespan."),
+    Rule("emails_plain", "Digital Activities", (("em_plain", ">", 10),),
+         "<b>Currently, your emails without attachments emit around {em_plain_impact:kg} kg CO₂e/year. </b> "
+         "To reduce this, opt for instant messaging where possible."),
+    # --- AI
+    Rule("ai_queries_volume", "Artificial Intelligence", (("ai_total_queries", ">", 30),),
+         "<b>You're asking about {ai_total_queries} AI queries per day. </b> "
+         "Try making more targeted requests to reduce this number and save energy."),
+]
+
+# === 3) VIRTÙ
+VIRTUE_RULES = [
+    Rule("used_devices", None, (("used_kinds", "!=", ""),),
+         "You chose a used device for your {used_kinds}! This typically reduces manufacturing emissions by 30–50% per device."),
+    Rule("long_lived_devices", None, (("long_lived_kinds", "!=", ""),),
+         "You use your {long_lived_kinds} for more than 5 years! Extending device life reduces the need for new "
+         "production and saves valuable resources."),
+    Rule("good_eol", None, (("has_good_eol", "==", True),),
+         "You dispose some of devices responsibly! EU aims to achieve a correct e-waste disposal rate of 65%, "
+         "but many countries are still below this threshold."),
+    Rule("few_attachments", None, (("em_attach", "<=", 10),),
+         "You keep the exchange of emails with attachments low. An email with an attachment typically weighs "
+         "almost ten times more than one without."),
+    Rule("light_cloud", None, (("cloud_gb", "<=", 20),),
+         "You keep your cloud storage light by cleaning up files you no longer need! This reduces the energy "
+         "required to store and maintain them."),
+    Rule("turns_off", None, (("idle_turns_off", "==", True),),
+         "You turn off your computer when not in use. This single action can save over 150 kWh of energy per "
+         "year for a single computer!"),
+    Rule("no_printing", None, (("pages", "==", 0),),
+         "You never print. This saves paper, ink, and the energy needed for printing... the trees thank you!"),
+    Rule("moderate_ai", None, (("ai_total_queries", "<=", 20),),
+         "You use AI sparingly, staying under 20 queries a day. This reduces the energy consumed by high-compute "
+         "AI models."),
+]
+
+RULES = rules.RuleSet(TIP_RULES + VIRTUE_RULES)
+
+
+def evaluate(answers: Answers, fs: FactorSet) -> tuple[dict, list]:
+    """({categoria: [consigli personalizzati]}, [virtù]) in un solo passaggio sulle regole."""
+    personalized = {cat: [] for cat in GENERIC_TIPS}
+    virtues = []
+    for rule, text in RULES.evaluate(rules.features(answers, fs)):
+        if rule.category is None:
+            virtues.append(text)
+        else:
+            personalized[rule.category].append(text)
+    return personalized, virtues
+
+
+def _dedup_keep_order(seq):
+    seen = set()
+    out = []
+    for x in seq:
+        if x not in seen:
+            out.append(x)
+            seen.add(x)
+    return out
+
+
+def select_tips(personalized: dict, top_category: str, seed: str):
+    """(consigli per la categoria principale, [(categoria, consigli)] per le altre)."""
+    # --- TOP CATEGORY → show ALL tips (personalized + generic)
+    top_personal = list(personalized.get(top_category, []))
+    top_generic = GENERIC_TIPS.get(top_category, [])
+    top_tips = _dedup_keep_order(top_personal + top_generic)
+
+    # --- OTHER CATEGORIES → up to 2 tips each, prioritize personalized
+    rnd = random.Random(seed)  # stable per utente
+    others = []
+    for cat in [c for c in GENERIC_TIPS.keys() if c != top_category]:
+        pers = list(personalized.get(cat, []))
+        picked = pers[:2]  # take up to 2 personalized
+
+        if len(picked) < 2:
+            remaining = 2 - len(picked)
+            gen_pool = [g for g in GENERIC_TIPS.get(cat, []) if g not in picked]
+            if gen_pool:
+                picked += gen_pool if len(gen_pool) <= remaining else rnd.sample(gen_pool, remaining)
+
+        if picked:  # se resta solo 1 tip va bene
+            others.append((cat, picked))
+    return top_tips, others
@@ -0,0 +1,236 @@
+"""Elementi condivisi dalle pagine."""
+import functools
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from startup import import_times
+
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Stylesheet unico, servito da Streamlit (enableStaticServing) in app/static/:
+# ogni rerun invia solo la riga di @import, il browser tiene il CSS in cache.
+with open(os.path.join(APP_DIR, "static", "style.css"), "rb") as _f:
+    STYLESHEET_URL = f"app/static/style.css?v={hashlib.md5(_f.read()).hexdigest()[:8]}"
+
+
+def inject_styles():
+    html(f"<style>@import url('{STYLESHEET_URL}');</style>")
+
+
+# --- Byte HTML inviati per rerun (per pagina)
+
+_html_lock = threading.Lock()
+_html_stats = {}    # page -> {"runs", "bytes", "last", "max"}
+
+
+def html(markup: str):
+    """st.markdown con HTML, contando i byte inviati in questo rerun."""
+    st.session_state["_html_bytes"] = st.session_state.get("_html_bytes", 0) + len(markup.encode("utf-8"))
+    return st.markdown(markup, unsafe_allow_html=True)
+
+
+def begin_run():
+    _count_run("full")
+    st.session_state["_html_bytes"] = 0
+    st.session_state["_full_run_t0"] = time.perf_counter()
+
+
+def end_run(page: str):
+    nbytes = st.session_state.get("_html_bytes", 0)
+    with _html_lock:
+        s = _html_stats.setdefault(page, {"runs": 0, "bytes": 0, "last": 0, "max": 0})
+        s["runs"] += 1
+        s["bytes"] += nbytes
+        s["last"] = nbytes
+        s["max"] = max(s["max"], nbytes)
+    t0 = st.session_state.pop("_full_run_t0", None)
+    if t0 is not None:
+        _record_timing(page, "full", (time.perf_counter() - t0) * 1000)
+
+
+def html_stats() -> dict:
+    """{page: {runs, avg, last, max}} in byte di HTML per rerun."""
+    with _html_lock:
+        return {
+            page: {"runs": s["runs"], "avg": s["bytes"] / s["runs"], "last": s["last"], "max": s["max"]}
+            for page, s in _html_stats.items()
+        }
+
+
+# --- Tempo per interazione: rerun completo vs rerun del solo fragment
+
+_timing_lock = threading.Lock()
+_timings = {}   # (nome, "full" | "fragment") -> {"n", "total", "last", "max"} in ms
+
+
+def _record_timing(name: str, kind: str, ms: float):
+    with _timing_lock:
+        s = _timings.setdefault((name, kind), {"n": 0, "total": 0.0, "last": 0.0, "max": 0.0})
+        s["n"] += 1
+        s["total"] += ms
+        s["last"] = ms
+        s["max"] = max(s["max"], ms)
+
+
+def mark(name: str):
+    """Registra il tempo dall'inizio del rerun a questo punto (es. primo contenuto mostrato)."""
+    t0 = st.session_state.get("_full_run_t0")
+    if t0 is not None:
+        _record_timing(name, "full", (time.perf_counter() - t0) * 1000)
+
+
+def record_timing(name: str, ms: float):
+    """Registra una durata misurata altrove (es. attesa di un job in background)."""
+    _record_timing(name, "full", ms)
+
+
+def timed_fragment(name: str):
+    """
+    Come `@st.fragment`, ma misura ogni esecuzione della sezione. Dentro un
+    rerun completo conta come "full", da sola (interazione con un suo widget)
+    come "fragment". Con ?debug=1 ogni esecuzione da sola viene anche
+    stampata su stderr.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            kind = "full" if "_full_run_t0" in st.session_state else "fragment"
+            if kind == "fragment":
+                _count_run("fragment")
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                ms = (time.perf_counter() - t0) * 1000
+                _record_timing(name, kind, ms)
+                if kind == "fragment" and debug_enabled():
+                    # la riga su stderr solo con ?debug=1; il tempo finisce comunque in timing_stats()
+                    page = st.session_state.get("page", "")
+                    full = timing_stats().get(page, {}).get("full")
+                    ref = f" (full rerun {page}: {full['avg_ms']:.1f} ms avg)" if full else ""
+                    print(f"[timing] {name}: {ms:.1f} ms{ref}", file=sys.stderr)
+        return st.fragment(run)
+    return decorator
+
+
+def timing_stats() -> dict:
+    """{nome: {"full"|"fragment": {n, avg_ms, last_ms, max_ms}}}."""
+    with _timing_lock:
+        out = {}
+        for (name, kind), s in _timings.items():
+            out.setdefault(name, {})[kind] = {
+                "n": s["n"], "avg_ms": s["total"] / s["n"], "last_ms": s["last"], "max_ms": s["max"],
+            }
+        return out
+
+
+# --- Navigazione e modalità debug
+
+def go_to(page: str):
+    """Callback dei bottoni di navigazione: cambia pagina senza un secondo rerun."""
+    st.session_state.page = page
+
+
+def _count_run(kind: str):
+    runs = st.session_state.setdefault("_run_count", {"full": 0, "fragment": 0})
+    runs[kind] += 1
+
+
+def debug_enabled() -> bool:
+    return st.query_params.get("debug") == "1"
+
+
+def session_state_size() -> tuple[int, dict]:
+    """(byte totali, {chiave: byte}) dello stato di sessione, misurati con pickle."""
+    sizes = {}
+    for key in list(st.session_state.keys()):
+        try:
+            sizes[key] = len(pickle.dumps(st.session_state[key]))
+        except Exception:
+            sizes[key] = -1     # non serializzabile
+    return sum(n for n in sizes.values() if n > 0), sizes
+
+
+def show_debug():
+    """Pannello laterale con ?debug=1: esecuzioni per sessione e metriche di processo."""
+    runs = st.session_state.get("_run_count", {})
+    with st.sidebar:
+        st.markdown("### Debug")
+        c1, c2 = st.columns(2)
+        c1.metric("Script runs", runs.get("full", 0))
+        c2.metric("Fragment runs", runs.get("fragment", 0))
+        total, sizes = session_state_size()
+        st.metric("Session state", f"{total / 1024:.1f} KB", f"{len(sizes)} keys", delta_color="off")
+        with st.expander("Session state (bytes)"):
+            st.json(dict(sorted(sizes.items(), key=lambda kv: -kv[1])))
+        with st.expander("Timing (ms)"):
+            st.json(timing_stats())
+        with st.expander("HTML per rerun (bytes)"):
+            st.json(html_stats())
+        with st.expander("Import times (ms)"):
+            st.json(import_times())
+        with st.expander("Storage backend"):
+            from services import storage
+            st.json(storage().stats())
+        with st.expander("Answer cache"):
+            from services import answer_cache
+            st.json(answer_cache().stats())
+        with st.expander("Images served (per page)"):
+            import assets
+            st.json(assets.served_stats())
+        with st.expander("Role stats cache"):
+            from services import role_stats_cache
+            st.json(role_stats_cache().stats())
+
+
+def scroll_top():
+    components.html(
+        """
+        <script>
+        window.parent.scrollTo({top: 0, behavior: 'smooth'});
+        </script>
+        """,
+        height=0,
+    )
+
+
+ARCHETYPES = [
+    {
+        "key": "Devices",
+        "name": "Lord of the Latest Gadgets",
+        "category": "Devices",
+        "image": "lord_of_the_latest_gadgets.png",   # file nella stessa cartella di app.py
+    },
+    {
+        "key": "ai",
+        "name": "Prompt Pirate, Ruler of the Queries",
+        "category": "Artificial Intelligence",
+        "image": "prompt_pirate.png",
+    },
+    {
+        "key": "weee",
+        "name": "Guardian of the Eternal E-Waste Pile",
+        "category": "E-Waste",
+        "image": "guardian_ewaste.png",
+    },
+    {
+        "key": "activities",
+        "name": "Master of Endless Streams",
+        "category": "Digital Activities",
+        "image": "master_endless_streams.png",
+    },
+]
+
+AVERAGE_CO2_BY_ROLE = {
+    "Student": 297,      
+    "Professor": 323,
+    "Staff Member": 309,
+}
@@ -0,0 +1,72 @@
+import streamlit as st
+
+from views.common import go_to, html, scroll_top
+
+
+CONTACT_EMAIL = "marta.pinzone@polimi.it"
+
+def show_final():
+    scroll_top()
+
+    name = (st.session_state.get("name") or "").strip()
+    html(f"""
+        <div style="background: linear-gradient(to right, #d8f3dc, #a8dadc);
+                    padding: 40px 25px; border-radius: 15px; text-align:center;
+                    box-shadow: 0 4px 18px rgba(0,0,0,0.06); margin-bottom: 30px;">
+            <h2 style="font-size:2.2rem; color:#1d3557; margin-bottom:0.6em;">
+                Great job, {name}! Keep going💪
+            </h2>
+            <p style="font-size:1.05rem; color:#1b4332; line-height:1.6; max-width:760px; margin:0 auto;">
+                By completing this tool, you are already part of the change towards greener digital practices.
+                <br><br>
+                The emission factors used in the calculator come primarily from internationally recognized databases, 
+                such as Ecoinvent v3.11 and Base Carbone® (ADEME, v23.7). Where not available, they have been 
+                supplemented with peer-reviewed scientific studies and specialized literature, listed below.
+                <br><br>
+                If you would like more information about the calculator or the <i>Green DiLT</i> project,
+                or if you have suggestions for improvement, feel free to contact us at:
+                <b>{CONTACT_EMAIL}</b>.
+            </p>
+        </div>
+    """)
+
+    # 📚 Tendina delle fonti fuori dal box verde
+    html("""
+        <details style="margin-top:10px; cursor:pointer;">
+            <summary style="font-weight:bold; color:#1b4332; font-size:1rem;">
+                Literature sources
+            </summary>
+            <ul style="margin-top:10px; padding-left:20px; color:#1b4332; text-align:left;">
+                <li>Herrmann et al. (2023): <i>The Climate Impact of the Usage of Headphones and Headsets</i></li>
+                <li>Sanchez-Cuadrado & Morato (2024): <i>The carbon footprint of Spanish university websites</i></li>
+                <li>Dias & Arroja (2012): <i>Comparison of methodologies for estimating the carbon footprint – case study of office paper</i></li>
+                <li>Lannelongue & Inouye (2023): <i>Carbon footprint estimation for computational research</i></li>
+                <li>Jegham et al. (2025): <i>How Hungry is AI? Benchmarking Energy, Water, and Carbon Footprint of LLM Inference</i></li>
+                <li>Tomlinson et al. (2024): <i>The Carbon Emissions of Writing and Illustrating Are Lower for AI than for Humans</i></li>
+                <li>André et al. (2019): <i>Resource and environmental impacts of using second-hand laptop computers: A case study of commercial reuse</i></li>
+                <li>Choi et al. (2006): <i>Life Cycle Assessment of a Personal Computer and its Effective Recycling Rate</i></li>
+                <li>Yuksek et al. (2023): <i>Sustainability Assessment of Electronic Waste Remanufacturing: The Case of Laptop</i></li>
+                <li>Tua et al. (2022): <i>Editoria scolastica e impatti ambientali: analisi del caso Zanichelli tramite la metodologia LCA</i></li>
+            </ul>
+        </details>
+    """)
+
+
+
+
+    # --- Navigazione finale ---
+    st.markdown("### ")
+    left, _, right = st.columns([1, 4, 1])
+    with left:
+        st.button("⬅️ Back", key="final_back_btn", use_container_width=True, on_click=go_to, args=("virtues",))
+    with right:
+        st.button("✏️ Edit your answers", key="final_edit_btn", use_container_width=True, on_click=go_to, args=("main",))
+    
+    _, _, right = st.columns([1, 4, 1])        
+    with right:
+        st.button("🔄 Restart", key="final_restart_btn", use_container_width=True, on_click=_restart)
+
+
+def _restart():
+    st.session_state.clear()
+    st.session_state.page = "intro"
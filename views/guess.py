@@ -0,0 +1,57 @@
+import streamlit as st
+
+from services import show_image
+from views.common import ARCHETYPES, go_to, html, scroll_top
+
+
+def show_guess():
+    scroll_top()
+
+    if "archetype_guess" not in st.session_state:
+        st.session_state.archetype_guess = None
+
+    # --- Box identico a intro ---
+    html(f"""
+        <div class="intro-box">
+            <h2 style="margin:.2rem 0;">{st.session_state.get('name','')}, before you discover your full Digital Carbon Footprint, take a guess!</h2>
+            <p style="margin:.2rem 0; color:#1b4332;">
+                Based on the area where you think you have the biggest impact, which digital archetype matches you best?
+            </p>
+        </div>
+    """)
+
+
+    cols = st.columns(4)
+    for i, arc in enumerate(ARCHETYPES):
+        with cols[i]:
+            # contenitore unico con bordo (titolo+img+badge+bottone)
+            cont = st.container(border=True)
+            with cont:
+                # aggiungo una classe 'picked' al contenitore se selezionato
+                if st.session_state.get("archetype_guess") == arc["key"]:
+                    html('<div class="picked">')
+
+                html(f"<div class='arc-card'><h4>{arc['name']}</h4></div>")
+                show_image(arc["image"], 290, "guess")
+                html(f"<div style='text-align:center;'><span class='arc-badge'>{arc['category']}</span></div>")
+
+                st.button("Choose", key=f"choose_{arc['key']}", use_container_width=True,
+                          on_click=_choose, args=(arc["key"],))
+
+                if st.session_state.get("archetype_guess") == arc["key"]:
+                    html("</div>")
+
+    st.markdown("### ")
+    left, _, right = st.columns([1, 4, 1])
+    with left:
+        st.button("⬅️ Back", key="guess_back_btn", use_container_width=True, on_click=go_to, args=("main",))
+    with right:
+        st.button("Discover your Carbon Footprint➡️",
+                  key="guess_continue_btn",
+                  use_container_width=True,
+                  disabled=st.session_state.get("archetype_guess") is None,
+                  on_click=go_to, args=("results_cards",))
+
+
+def _choose(key):
+    st.session_state.archetype_guess = key
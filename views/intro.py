@@ -0,0 +1,84 @@
+import streamlit as st
+
+from services import show_image
+from views.common import html, scroll_top
+
+
+# INTRO PAGE 
+
+def show_intro():
+    scroll_top()
+
+    # --- HERO INTUITIVO
+    html("""
+        <div class="intro-box">
+            <h1 style="font-size: 2.6em; text-align: center; margin: 0;">
+                Digital Carbon Footprint Calculator📱
+            </h1>
+        </div>
+    """)
+
+
+    # --- TESTO DESCRITTIVO + LOGO A DESTRA (Streamlit columns, no <img>) ---
+    col_welcome, col_logo = st.columns([8, 2])
+
+    with col_welcome:
+        html(
+        """
+        <div style="margin-top:20px;">
+        Welcome to the <b>Digital Carbon Footprint Calculator</b>, a tool developed within the <i>Green DiLT project</i> to raise awareness about the hidden environmental impact of digital habits in academia.
+
+        This calculator is tailored for <b>university students, professors, and staff members</b>, helping you estimate your CO₂e emissions from everyday digital activities, often overlooked, but increasingly relevant.
+        </div>
+        """
+        )
+
+    with col_logo:
+        # Logo grande che occupa lo spazio a destra
+        box = st.container()
+        with box:
+            show_image("logo.png", 300, "intro")  # <-- niente <img>, funziona anche con repo privata
+            show_image("logo2.png", 300, "intro")
+
+    st.divider()  # linea continua a tutta larghezza
+
+
+
+
+    # --- SELECTBOX ---
+    with st.container():
+        st.session_state.role = st.selectbox(
+            "What is your role in academia?",
+            ["", "Student", "Professor", "Staff Member"],
+            key="role_input",
+        )
+
+    # --- INPUT NOME ---
+    st.session_state.name = st.text_input("What is your name?", key="name_input")
+
+    # --- PRIVACY DISCLAIMER ---
+    html(
+        "<p style='font-size:0.85rem; color:gray; margin-top:-6px;'>"
+        "The information collected will be processed exclusively for research and educational purposes, in compliance with applicable data protection regulations, and will be handled confidentially and anonymously."
+        "</p>"
+    )
+
+    
+    # --- BOTTONE START ---
+    html('<div class="start-button">')
+    st.button("➡️ Start Calculation", on_click=_start)
+    if st.session_state.pop("intro_warning", False):
+        st.warning("⚠️ Please enter your name and select your role before continuing.")
+    html('</div>')
+
+
+def _start():
+    # nel callback i widget hanno già il valore appena inviato
+    role = st.session_state.get("role_input", "")
+    name = st.session_state.get("name_input", "")
+    if role and name.strip():
+        st.session_state.role = role
+        st.session_state.name = name
+        st.session_state.page = "main"
+    else:
+        st.session_state.intro_warning = True
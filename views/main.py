@@ -0,0 +1,562 @@
+from dataclasses import dataclass
+
+import streamlit as st
+
+import factors
+from engine import (
+    Answers,
+    DeviceAnswer,
+    IDLE_OFF,
+    SELECT,
+    SELECT_OPTION,
+)
+from schema import ACTIVITY, AI_TASK, encode_answers
+from views import prefetch
+from views.common import go_to, html, scroll_top, timed_fragment
+
+
+@dataclass(slots=True)
+class DeviceRecord:
+    """Un device aggiunto dall'utente; i valori sono quelli confermati."""
+    kind: str
+    years: float = 1.0
+    used: str = SELECT
+    shared: str = SELECT
+    eol: str = SELECT
+    is_open: bool = True    # expander aperto finché non viene confermato
+    token: int = 0          # cambia l'etichetta per forzare il re-mount alla conferma
+    idk: bool = False       # "I don't know" sulla durata
+
+
+# widget di ogni card, con chiave f"dev{id}_{nome}"
+DEVICE_WIDGETS = ("shared", "used", "years", "idk", "eol", "remove", "confirm", "confirm_warn")
+
+
+def _wkey(device_id: int, name: str) -> str:
+    return f"dev{device_id}_{name}"
+
+
+# MAIN PAGE
+def show_main():
+    scroll_top()
+
+
+    html(f"""
+    <div style="
+        background: linear-gradient(to right, #d8f3dc, #a8dadc);
+        padding: 25px 20px;
+        border-radius: 12px;
+        box-shadow: 0 4px 18px rgba(0,0,0,0.06);
+        text-align: center;
+        margin-bottom: 20px;
+    ">
+        <h1 style="font-size: 2.2em; color:#1d3557; margin-bottom: 0;">
+            Hello <b>{st.session_state.name}</b>, it’s time to uncover the impact of your digital world! 🚀
+        </h1>
+    </div>
+""")
+
+
+    html("""
+        <p style="font-size: 1em; color: #6c757d; margin-top: -8px;">
+            First, we’ll ask you a few quick questions about your studying/working habits. This will take less than <b>5 minutes</b>.
+        </p>
+    """)
+
+    html("""
+    <h3 style="margin-top: 25px; color:#1d3557;">💻 Devices & E-Waste</h3>
+    <p>
+        Please select only the digital devices you use for <b>study or work</b>. Example: If you own a personal smartphone and a work smartphone, include <b>only the one used for study or work</b>. 
+    </p>
+    """)
+
+
+    # --- STATE INIT ---
+    # id intero stabile -> DeviceRecord, in ordine di inserimento
+    if "devices" not in st.session_state:
+        st.session_state.devices = {}
+    if "next_device_id" not in st.session_state:
+        st.session_state.next_device_id = 0
+
+    # --- Device picker più chiaro (quantità per tipo) ---
+
+    device_emoji = {
+        "Desktop Computer": "🖥️", "Laptop Computer": "💻", "Smartphone": "📱", "Tablet": "📲",
+        "External Monitor": "🖥️", "Headphones": "🎧", "Printer": "🖨️", "Home Router/Modem": "🛜", "Projector": "📽️", "Maxi-screen": "📺"
+    }
+
+    st.markdown("**Set a quantity for each device you own. Then, you will then be asked a few details about how you use it and what you do when it is no longer needed.**")
+
+    fs = factors.current()
+
+    # Filtra i device in base al ruolo
+    role_curr = st.session_state.get("role", "")
+    if role_curr == "Student":
+        # Gli studenti non vedono Maxi-screen e Projector
+        types = [d for d in fs.device_ef.keys() if d not in ["Maxi-screen", "Projector"]]
+        num_cols = 4
+    else:
+        # Professor o Staff Member vedono tutti i device
+        types = list(fs.device_ef.keys())
+        num_cols = 5
+
+    # memorizza le quantità precedenti per rilevare cambi (no bottone)
+    if "picker_prev" not in st.session_state:
+        st.session_state.picker_prev = {t: 0 for t in types}
+    else:
+        for _t in types:
+            st.session_state.picker_prev.setdefault(_t, 0)
+
+    # reset sicuro delle qty dopo "Add selected devices"
+    if st.session_state.get("_picker_reset"):
+        for t in types:
+            st.session_state.pop(f"picker_qty_{t}", None)
+        st.session_state["_picker_reset"] = False
+
+    # Crea il layout dinamico (4 colonne per studenti, 5 per altri)
+    cols = st.columns(num_cols)
+    for i, t in enumerate(types):
+        with cols[i % num_cols]:
+            st.markdown(f"{device_emoji.get(t, '•')} **{t}**")
+            st.number_input(
+                "Qty",
+                min_value=0,
+                max_value=10,
+                value=st.session_state.picker_prev.get(t, 0),
+                step=1,
+                key=f"picker_qty_{t}",
+                label_visibility="collapsed",
+                on_change=_on_picker_change,
+                args=(t,),
+            )
+
+
+    # Riepilogo compatto dei device già aggiunti
+    from collections import Counter
+    if st.session_state.devices:
+        counts = Counter(st.session_state.devices[d].kind for d in _device_ids())
+        chips = "".join(
+            f"<span class='chip'>{device_emoji.get(k, '•')} {k} × {v}</span>"
+            for k, v in counts.items()
+        )
+        html(f"<div class='chips'>{chips}</div>")
+
+
+    for device_id in _device_ids():
+        _device_card(device_id)
+
+
+    # === DIGITAL ACTIVITIES ===
+
+    html("""
+        <h3 style="margin-top: 25px; color:#1d3557;">🔌 Digital Activities</h3>
+        <p>
+            Estimate how many hours per day you spend on each activity during a typical 8-hour study or work day.
+            <br>
+            <b style="color: #40916c;">You may exceed 8 hours if multitasking</b> 
+            <span style="color: #495057;">(e.g., watching a lecture while writing notes).</span>
+        </p>
+    """)
+
+    _activities_block()
+
+
+    # === AI TOOLS ===
+    html("""
+    <h3 style="margin-top: 25px; color:#1d3557;">🦾 AI Tools</h3>
+    <p>
+        Estimate how many queries you make for each AI-powered task on a typical 8-hour study/working day.
+        As a reference, users submit approximately 15 to 20 queries during a half-hour interaction with an AI assistant.
+    </p>
+    """)
+
+    _ai_block()
+
+
+    # === FINAL BUTTONS (BACK + NEXT) ===
+    col_back, col_space, col_next = st.columns([1, 4, 1])
+
+    with col_back:
+        st.button("⬅️ Back", key="main_back_btn", use_container_width=True, on_click=go_to, args=("intro",))
+
+    with col_next:
+        st.button(
+            "Next ➡️",
+            key="main_next_btn",
+            use_container_width=True,
+            on_click=_on_next,
+        )
+
+    # Mostra eventuali warning del Next
+    for msg in st.session_state.pop("main_warnings", []):
+        st.warning(msg)
+
+
+# --- Sezioni come fragment: un widget modificato riesegue solo la sua sezione;
+# le risposte vengono lette dai widget in _answers() al Next.
+
+@timed_fragment("main.device_card")
+def _device_card(device_id):
+    rec = st.session_state.devices[device_id]
+    base_device = rec.kind
+
+    # Cambiamo l’etichetta SOLO quando vogliamo forzare la chiusura
+    suffix = "" if rec.is_open else ("\u200B" * (rec.token + 1))
+    label = f"{base_device}{suffix}"
+
+    with st.expander(label, expanded=rec.is_open):
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            html("""
+                <div style='margin-bottom:-20px'>
+                    <strong>Ownership</strong><br/>
+                    <span style='font-size:12px; color:gray'>Is this device used only by you or shared?</span>
+                </div>
+            """)
+            shared_options = ["-- Select --", "Personal", "Shared with family", "Shared in university"]
+            shared_index = shared_options.index(rec.shared) if rec.shared in shared_options else 0
+            st.selectbox("", shared_options, index=shared_index, key=_wkey(device_id, "shared"))
+
+        with col2:
+            html("""
+                <div style='margin-bottom:-20px'>
+                    <strong>Condition</strong><br/>
+                    <span style='font-size:12px; color:gray'>Was the device new or used when you got it?</span>
+                </div>
+            """)
+            used_options = ["-- Select --", "New", "Used"]
+            used_index = used_options.index(rec.used) if rec.used in used_options else 0
+            st.selectbox("", used_options, index=used_index, key=_wkey(device_id, "used"))
+
+        with col3:
+            html("""
+                <div style='margin-bottom:-20px'>
+                    <div class="label-with-tooltip">
+                        <strong>Device's lifespan</strong>
+                        <div class="info-icon">i
+                            <div class="tooltip-text">
+                                <b>Example:</b> if you have had a phone for 2 years and expect to keep it for 3 more, enter 5. 
+                                If the device was purchased second-hand, only count your own usage period, not the years used by the previous owner.
+                            </div>
+                        </div>
+                    </div>
+                    <span style='font-size:12px; color:gray'>
+                        How many years you plan to use the device in total
+                    </span>
+                </div>
+            """)
+
+            years_key = _wkey(device_id, "years")
+            avg_years = factors.current().default_lifespan.get(base_device, 5)
+
+            # Se "I don't know" è attivo, forza il valore medio e disabilita l'input
+            if rec.idk:
+                st.session_state[years_key] = float(avg_years)
+                st.number_input(
+                    "",
+                    0.5,
+                    20.0,
+                    step=0.5,
+                    format="%.1f",
+                    key=years_key,
+                    disabled=True
+                )
+            else:
+                st.number_input(
+                    "",
+                    0.5,
+                    20.0,
+                    step=0.5,
+                    format="%.1f",
+                    key=years_key
+                )
+
+            # --- "I don't know" single-radio style toggle ---
+
+
+            st.checkbox(
+                "I don’t know",
+                value=rec.idk,
+                key=_wkey(device_id, "idk"),
+                 help="If you select this option, the average lifespan of the device will be considered.",
+                label_visibility="visible",
+                on_change=_on_idk_change,
+                args=(device_id,),
+            )
+
+        
+        with col4:
+            html("""
+                <div style='margin-bottom:-20px'>
+                    <strong>End-of-life behavior</strong><br/>
+                    <span style='font-size:12px; color:gray'>What do you usually do when the device reaches its end of life?</span>
+                </div>
+            """)
+            role_curr = st.session_state.get("role", "")
+            all_eol = list(factors.current().eol_modifier.keys())
+            # Filtra la nuova opzione per gli studenti
+            filtered_eol = [
+                k for k in all_eol
+                if (role_curr in ["Professor", "Staff Member"]) or (k != "Device provided by the university, I return it after use")
+            ]
+            eol_options = ["-- Select --"] + filtered_eol               
+            eol_index = eol_options.index(rec.eol) if rec.eol in eol_options else 0
+            st.selectbox("", eol_options, index=eol_index, key=_wkey(device_id, "eol"))
+
+        col_remove, _, col_confirm = st.columns([1, 8, 1])
+
+        with col_remove:
+            st.button("🗑 Remove", key=_wkey(device_id, "remove"), on_click=_remove_device, args=(device_id,))
+
+        with col_confirm:
+            st.button("✅ Confirm", key=_wkey(device_id, "confirm"), on_click=_confirm_device, args=(device_id,))
+        if st.session_state.pop(_wkey(device_id, "confirm_warn"), False):
+            st.warning("Please complete all fields before confirming.")
+
+
+@timed_fragment("main.activities")
+def _activities_block():
+    role = st.session_state.role
+    ore_dict = {}
+    col1, col2 = st.columns(2)
+
+    # Sliders con -- Select --
+    for i, (act, ef) in enumerate(factors.current().activity_factors[role].items()):
+        with (col1 if i % 2 == 0 else col2):
+            ore = st.slider(
+                f"{act} (h/day)",
+                min_value=0.0,
+                max_value=8.0,
+                value=0.0,
+                step=0.5,
+                key=f"act_{ACTIVITY.code(act)}"
+            )
+            ore_dict[act] = ore
+
+    total_hours_raw = sum(ore_dict.values())
+    warn_color = "#B58900"  # giallo scuro
+    color = "#6EA8FE" if total_hours_raw <= 8 else warn_color
+
+    # Riga totale ore (con colore condizionale)
+    html(
+        f"<div style='text-align:right; font-size:0.9rem; color:{color}; margin-top:-6px;'>"
+        f"Total: <b>{total_hours_raw:.1f}</b> h/day</div>"
+    )
+
+    # Nota esplicativa se supera 8h
+    if total_hours_raw > 8:
+        html(
+            "<div style='text-align:right; font-size:0.85rem; color:#B58900; margin-top:-8px;'>"
+            "Overlapping activities can push the total above 8 hours.</div>"
+        )
+
+    
+    # Parte 2: Email, cloud, printing, connectivity
+    html("""
+        <hr style="margin-top: 30px; margin-bottom: 20px;">
+        <p style="font-size: 17px; line-height: 1.5;">
+            Now tell us more about your habits related to <b style="color: #40916c;">email, cloud, printing and connectivity</b>.
+        </p>
+        <p style="font-size: 13px; color: gray; margin-top: 8px;">
+            How many study or work emails do you send or receive in a typical 8-hour day? 
+            Please do not count spam messages.
+        </p>
+    """)
+
+    email_opts = ["-- Select option --", "0", "1–10", "11–20", "21–30", "31–40", "41–80", "81–100", ">100"]
+    cloud_opts = ["-- Select option --", "<5GB", "5–20GB", "20–50GB", "50–100GB", "100–200GB"]
+
+
+    email_col1, email_col2 = st.columns(2)
+
+    with email_col1:
+        st.selectbox("Emails (no attachments)", email_opts, index=0, key="email_plain")
+
+    with email_col2:
+        st.selectbox("Emails (with attachments)", email_opts, index=0, key="email_attach")
+
+    st.selectbox("Cloud storage you currently use for academic or work-related files (e.g., on iCloud, Google Drive, OneDrive)", cloud_opts, index=0, key="cloud")
+
+    st.slider("Estimate your daily Wi-Fi connection time during a typical 8-hour study or work day, including hours when you're not actively using your device (e.g., background apps, idle mode)", 0.0, 8.0, 4.0, 0.5, key="wifi")
+    st.number_input("Printed pages per week", 0, 100, 0, key="pages")
+
+    st.radio("Do you turn off your computer at the end of the workday, or leave it on standby?", ["I turn it off", "I leave it on (idle mode)", "I don’t have a computer"],
+    key="idle")
+
+
+@timed_fragment("main.ai")
+def _ai_block():
+    cols = st.columns(4)
+
+    for i, (task, ef) in enumerate(factors.current().ai_factors.items()):
+        with cols[i % 4]:
+            html(f"""
+            <div style='margin-bottom: 12px;'>
+                <div style='
+                    font-weight: 600;
+                    font-size: 15px;
+                    color: #1d3557;
+                    margin-bottom: 6px;
+                '>
+                    {task}
+                </div>
+            """)
+
+            st.number_input(
+                label="",
+                min_value=0,
+                max_value=10000,
+                value=0,
+                step=5,
+                key=f"ai_{AI_TASK.code(task)}",
+                label_visibility="collapsed"
+            )
+
+            html("</div>")
+
+
+# --- Callback: modificano lo stato prima del rerun, così ogni interazione
+# costa una sola esecuzione dello script (l'unico st.rerun() è in _remove_device,
+# che sostituisce il rerun del fragment).
+
+def _on_picker_change(t):
+    """Applica la differenza di quantità per il tipo `t`."""
+    desired = int(st.session_state.get(f"picker_qty_{t}", 0) or 0)
+    prev = int(st.session_state.picker_prev.get(t, 0))
+    if desired == prev:
+        return
+
+    delta = desired - prev
+    devices = st.session_state.devices
+    # AGGIUNGI
+    if delta > 0:
+        for _ in range(delta):
+            new_id = st.session_state.next_device_id
+            st.session_state.next_device_id += 1
+            devices[new_id] = DeviceRecord(t)
+
+    # RIMUOVI (prima non confermati, poi i più recenti)
+    else:
+        ids_of_type = [i for i in _device_ids() if devices[i].kind == t]
+        ordered = [i for i in ids_of_type if devices[i].is_open] + [i for i in ids_of_type if not devices[i].is_open]
+        for rid in ordered[:-delta]:
+            _drop_device(rid)
+
+    # aggiorna il "precedente" per questo tipo
+    st.session_state.picker_prev[t] = desired
+
+
+def _on_idk_change(device_id):
+    st.session_state.devices[device_id].idk = st.session_state[_wkey(device_id, "idk")]
+
+
+def _drop_device(device_id):
+    """Rimuove il device e le chiavi dei suoi widget, che altrimenti resterebbero in sessione."""
+    st.session_state.devices.pop(device_id, None)
+    for name in DEVICE_WIDGETS:
+        st.session_state.pop(_wkey(device_id, name), None)
+
+
+def _remove_device(device_id):
+    """Remove dentro il fragment: la lista cambia, quindi un solo rerun dell'intera app al posto di quello del fragment."""
+    _drop_device(device_id)
+    st.rerun(scope="app")
+
+
+def _confirm_device(device_id):
+    d = _device_answer(device_id)
+    if SELECT in [d.used, d.shared, d.eol]:
+        st.session_state[_wkey(device_id, "confirm_warn")] = True
+        return
+    rec = st.session_state.devices[device_id]
+    rec.years, rec.used, rec.shared, rec.eol = d.years, d.used, d.shared, d.eol
+    # Forza CHIUSURA e RE-MOUNT dell'expander
+    rec.is_open = False
+    rec.token += 1
+
+
+def _devices_missing():
+    """
+    Ritorna True se esiste almeno un device con select lasciate su '-- Select --'
+    (Ownership/Condition/EOL) oppure senza anni validi.
+    """
+    for rec in st.session_state.get("devices", {}).values():
+        if (
+            rec.used == "-- Select --" or
+            rec.shared == "-- Select --" or
+            rec.eol == "-- Select --" or
+            float(rec.years or 0) <= 0
+        ):
+            return True
+    return False
+
+
+def _on_next():
+    unconfirmed_devices = [
+        key for key, rec in st.session_state.get("devices", {}).items()
+        if rec.is_open
+    ]
+
+    missing_activities = (
+        st.session_state.get("email_plain", "-- Select option --") == "-- Select option --"
+        or st.session_state.get("email_attach", "-- Select option --") == "-- Select option --"
+        or st.session_state.get("cloud", "-- Select option --") == "-- Select option --"
+    )
+    no_devices = len(st.session_state.get("devices", {})) == 0
+    missing_devices = _devices_missing()
+
+    warnings = []
+    if no_devices:
+        warnings.append("⚠️ Please add at least one device.")
+    if unconfirmed_devices:
+        warnings.append("⚠️ You have devices not yet confirmed. Please click 'Confirm' in each box to proceed.")
+    if missing_devices and not no_devices:
+        warnings.append("⚠️ Please complete Ownership, Condition, and End-of-life for all devices, then press 'Confirm'.")
+    if missing_activities:
+        warnings.append("⚠️ Please complete all digital activity fields before continuing.")
+    if warnings:
+        st.session_state.main_warnings = warnings
+        return
+
+    answers = _answers()
+    st.session_state.factor_version = factors.current().version
+    st.session_state.answers_code = encode_answers(answers)
+    # footprint, consigli e risultati si calcolano in background mentre l'utente è sulla pagina dell'archetipo
+    prefetch.start(answers)
+    st.session_state.page = "guess"
+
+
+# --- Risposte lette dai widget (nei callback il valore è già aggiornato)
+
+def _device_ids() -> list[int]:
+    """Id dei device, dal più recente (le card nuove compaiono in cima)."""
+    return list(reversed(st.session_state.devices))
+
+
+def _device_answer(device_id) -> DeviceAnswer:
+    state = st.session_state
+    return DeviceAnswer(
+        state.devices[device_id].kind,
+        state.get(_wkey(device_id, "used"), SELECT),
+        state.get(_wkey(device_id, "shared"), SELECT),
+        state.get(_wkey(device_id, "years"), 1.0),
+        state.get(_wkey(device_id, "eol"), SELECT),
+    )
+
+
+def _answers() -> Answers:
+    state = st.session_state
+    fs = factors.current()
+    return Answers(
+        role=state.role,
+        devices=[_device_answer(d) for d in _device_ids()],
+        activity_hours={act: state.get(f"act_{ACTIVITY.code(act)}", 0.0) for act in fs.activity_factors[state.role]},
+        email_plain=state.get("email_plain", SELECT_OPTION),
+        email_attach=state.get("email_attach", SELECT_OPTION),
+        cloud=state.get("cloud", SELECT_OPTION),
+        wifi_hours=state.get("wifi", 4.0),
+        pages=int(state.get("pages", 0) or 0),
+        idle=state.get("idle", IDLE_OFF),
+        ai_queries={task: state.get(f"ai_{AI_TASK.code(task)}", 0) for task in fs.ai_factors},
+    )
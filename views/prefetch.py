@@ -0,0 +1,137 @@
+"""
+Calcolo anticipato delle pagine dei risultati.
+
+Al Next del questionario `start()` lancia nel pool in background tutto il
+calcolo: valutazione delle risposte (answer_cache: footprint, consigli, virtù,
+azioni) e results.build_bundle. Il click non aspetta niente; mentre l'utente
+sceglie l'archetipo il bundle è già in calcolo e le pagine dei risultati
+leggono `bundle()`, che lo aspetta se serve.
+
+Bundle e job sono legati all'impronta delle risposte (results.fingerprint):
+dopo "Edit your answers" un Next senza modifiche riusa il bundle, una
+risposta cambiata lo invalida.
+
+La media dei pari passa dalla rete (Sheets, sync del mirror) e ha un job suo,
+legato al ruolo: solo la pagina delle card la aspetta, con un budget
+(`peer(timeout)`); le altre pagine leggono il bundle, che è solo calcolo.
+Un lookup fallito o senza risultato non resta in sessione: il successivo
+`peer()` ne lancia uno nuovo.
+"""
+import sys
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import streamlit as st
+
+import factors
+from engine import Answers
+from results import ResultsBundle, build_bundle, fingerprint, peer_average
+from schema import decode_answers
+from services import answer_cache, background, role_aggregates, role_avg_lookup
+from views.common import record_timing
+
+
+def current_fingerprint() -> str:
+    s = st.session_state
+    return fingerprint(s.get("answers_code"), s.get("name", ""), s.get("role", ""), s.get("factor_version"))
+
+
+def _compute(key: str, answers: Answers, fs, name: str, role: str, cache) -> ResultsBundle:
+    # combinazioni di risposte già viste (anche da altre sessioni) costano un lookup
+    return build_bundle(key, cache.evaluate(answers, fs), name, role)
+
+
+def _args(key: str, answers: Answers | None = None):
+    s = st.session_state
+    # risorse prese qui: il worker non tocca la sessione
+    if answers is None:
+        answers = decode_answers(s.answers_code)
+    return key, answers, factors.current(), s.get("name", ""), s.get("role", ""), answer_cache()
+
+
+def _usable(future) -> bool:
+    """Un lookup in corso o riuscito; quelli falliti o vuoti (breaker aperto, timeout) si rifanno."""
+    if not future.done():
+        return True
+    try:
+        avg, _ = future.result()
+    except Exception:
+        return False
+    return avg is not None
+
+
+def _start_peer(role: str):
+    job = st.session_state.get("peer_job")
+    if job is not None and job[0] == role and _usable(job[1]):
+        return job[1]
+    # risorse risolte qui: il worker non tocca la sessione
+    future = background().submit(peer_average, role_aggregates(), role_avg_lookup(), role)
+    st.session_state.peer_job = (role, future)
+    return future
+
+
+def start(answers: Answers):
+    """Da chiamare quando cambiano le risposte (callback del Next, dopo aver salvato answers_code)."""
+    _start_peer(st.session_state.get("role", ""))
+    key = current_fingerprint()
+    done = st.session_state.get("results_bundle")
+    if done is not None and done.fingerprint == key:
+        return
+    job = st.session_state.get("results_job")
+    if job is not None and job[0] == key:
+        return
+    st.session_state.pop("results_bundle", None)
+    st.session_state.results_job = (key, background().submit(_compute, *_args(key, answers)))
+
+
+def bundle(timeout: float | None = None) -> ResultsBundle | None:
+    """
+    Il bundle delle risposte correnti. Se il job è ancora in corso lo aspetta
+    al massimo `timeout` secondi (None: senza limite) e poi ritorna None.
+    Senza job valido, o se il job è fallito, lo calcola qui (niente rete).
+    None anche se il questionario non è ancora stato completato.
+    """
+    if st.session_state.get("answers_code") is None:
+        return None
+    key = current_fingerprint()
+    done = st.session_state.get("results_bundle")
+    if done is not None and done.fingerprint == key:
+        return done
+
+    done = None
+    job_key, job = st.session_state.get("results_job") or (None, None)
+    if job is not None and job_key == key:
+        t0 = time.perf_counter()
+        try:
+            done = job.result(timeout=timeout)
+        except FutureTimeout:
+            record_timing("prefetch.wait", (time.perf_counter() - t0) * 1000)
+            return None
+        except Exception as e:
+            print(f"[prefetch] job failed, building inline: {e}", file=sys.stderr)
+        record_timing("prefetch.wait", (time.perf_counter() - t0) * 1000)
+
+    if done is None:
+        done = _compute(*_args(key))
+    st.session_state.results_bundle = done
+    st.session_state.pop("results_job", None)
+    return done
+
+
+def peer(timeout: float) -> tuple | None:
+    """
+    (media, n) dei pari del ruolo corrente, aspettando al massimo `timeout`
+    secondi; None se il lookup non è ancora finito. Mai calcolata inline:
+    senza job ne parte uno e la pagina successiva lo trova pronto.
+    """
+    job = _start_peer(st.session_state.get("role", ""))
+    t0 = time.perf_counter()
+    try:
+        return job.result(timeout=timeout)
+    except FutureTimeout:
+        return None
+    except Exception as e:
+        print(f"[prefetch] peer lookup failed: {e}", file=sys.stderr)
+        return None, None
+    finally:
+        record_timing("prefetch.peer_wait", (time.perf_counter() - t0) * 1000)
@@ -0,0 +1,99 @@
+import streamlit as st
+
+from rules import fmt_kg
+from views import prefetch
+from views.common import go_to, html, scroll_top
+
+
+def show_results_breakdown():
+    scroll_top()
+    # header
+    html("""
+        <div style="background: linear-gradient(to right, #d8f3dc, #a8dadc); padding: 28px 16px; border-radius: 12px; text-align: center; margin-bottom: 16px;">
+            <h2 style="margin:0;">Your footprint breakdown📊</h2>
+        </div>
+    """)
+
+    bundle = prefetch.bundle()
+    res = bundle.results
+
+    html("<br><h3>Breakdown by Category:</h3>")
+    html(f"""
+        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(220px, 1fr)); gap: 15px;">
+            <div class="tip-card" style="text-align:center;">
+                <div style="font-size: 2em;">💻</div>
+                <div style="font-size: 1.2em;"><b>{res['Devices']:.2f} kg CO2e/year</b></div>
+                <div style="color: #555;">Devices</div>
+            </div>
+            <div class="tip-card" style="text-align:center;">
+                <div style="font-size: 2em;">🗑️</div>
+                <div style="font-size: 1.2em;"><b>{res['E-Waste']:.2f} kg CO2e/year</b></div>
+                <div style="color: #555;">E-Waste</div>
+            </div>
+            <div class="tip-card" style="text-align:center;">
+                <div style="font-size: 2em;">🔌</div>
+                <div style="font-size: 1.2em;"><b>{res['Digital Activities']:.2f} kg CO2e/year</b></div>
+                <div style="color: #555;">Digital Activities</div>
+            </div>
+            <div class="tip-card" style="text-align:center;">
+                <div style="font-size: 2em;">🦾</div>
+                <div style="font-size: 1.2em;"><b>{res['AI Tools']:.2f} kg CO2e/year</b></div>
+                <div style="color: #555;">AI Tools</div>
+            </div>
+        </div>
+    """)
+
+    # Show E-Waste notes conditionally
+    ewaste_val = float(res.get("E-Waste", 0) or 0)
+    eps = 1e-9  # to avoid float noise
+
+    if ewaste_val < -eps:
+        html("""
+            <div style="background-color:#fefae0; border-left: 6px solid #e09f3e; 
+                        padding: 14px; border-radius: 8px; margin-top: 18px;">
+                <h4 style="margin-top:0;">Why is my E-Waste impact negative?</h4>
+                <p style="margin:0; font-size: 15px; line-height: 1.5;">
+                    Sometimes your E-Waste value can be <b>negative</b>: this means that you adopt 
+                    responsible practices such as donating devices, bringing them to proper recycling 
+                    centers, or returning them to the manufacturer. 
+                    These actions help offset part of the CO₂ emissions associated with electronic devices, 
+                    and consequently reduce your overall footprint. Good job!
+                </p>
+            </div>
+        """)
+    else:
+        html("""
+            <div style="background-color:#fefae0; border-left: 6px solid #e09f3e; 
+                        padding: 14px; border-radius: 8px; margin-top: 18px;">
+                <h4 style="margin-top:0;">Did you know your E-Waste impact could reduce emissions?</h4>
+                <p style="margin:0; font-size: 15px; line-height: 1.5;">
+                    By making more responsible end-of-life choices for your devices, such as taking them to a
+                    certified e-waste collection center, returning them to the manufacturer,
+                    or selling/donating them for reuse, you can not only bring this category down to zero, but
+                    actually <b>offset</b> part of your overall emissions! 
+                </p>
+            </div>
+        """)
+
+
+    st.divider()
+
+    st.subheader("Hotspots at a glance")
+    st.plotly_chart(bundle.chart, use_container_width=True)
+
+    # le singole risposte che, cambiate di un passo, riducono di più il totale
+    if bundle.top_actions:
+        st.subheader("Where one change counts most")
+        for a in bundle.top_actions:
+            html(
+                f"<div class='tip-card'><b>{a.input}</b> — {a.action}: "
+                f"<b>−{fmt_kg(-a.delta_kg)} kg CO₂e/year</b></div>"
+            )
+
+    # Nav
+    st.markdown("### ")
+    left, _, right = st.columns([1, 4, 1])
+    with left:
+        st.button("⬅️ Back", key="res_brk_back", use_container_width=True, on_click=go_to, args=("results_cards",))
+    with right:
+        st.button("Next ➡️", key="res_brk_next", use_container_width=True, on_click=go_to, args=("results_equiv",))
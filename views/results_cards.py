@@ -0,0 +1,202 @@
+import os
+import time
+
+import streamlit as st
+
+from results import MIN_SAMPLES
+from services import role_aggregates, show_image
+from views import prefetch
+from views.common import ARCHETYPES, AVERAGE_CO2_BY_ROLE, go_to, html, mark, scroll_top
+
+
+# quanto aspettare la media dei pari, dall'inizio della pagina, prima di mostrare quella statica (secondi)
+PEER_BUDGET_S = float(os.environ.get("PEER_BUDGET_S", 0.8))
+CARD_STYLE = """
+    display:flex; flex-direction:column; justify-content:center; align-items:center;
+    gap:.55rem; min-height:220px; text-align:center;
+"""
+CARD_ACCENT = "border-left:4px solid #52b788; padding-left:12px;"
+
+
+PEER_CATEGORIES = {
+    "Total": "CO2 Total",
+    "Devices": "CO2 Devices",
+    "E-Waste": "CO2 E-Waste",
+    "Digital Activities": "CO2 Digital Activities",
+    "AI Tools": "CO2 AI",
+}
+
+
+def _ordinal(n: int) -> str:
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def _peer_chart(edges, counts, value):
+    import plotly.express as px  # plotly solo se ci sono abbastanza risposte per il grafico
+
+    centers = [(a + b) / 2 for a, b in zip(edges, edges[1:])]
+    width = edges[1] - edges[0]
+    # evidenzia il bin in cui cade l'utente
+    colors = ["#ff7f0e" if a <= value < a + width else "#95d5b2" for a in edges[:-1]]
+    if value < edges[0]:
+        colors[0] = "#ff7f0e"
+    elif value >= edges[-1]:
+        colors[-1] = "#ff7f0e"
+    fig = px.bar(x=centers, y=counts, height=160)
+    fig.update_traces(marker_color=colors, width=width * 0.9, hovertemplate="%{x:.0f} kg: %{y}<extra></extra>")
+    fig.update_layout(margin=dict(l=0, r=0, t=4, b=0), plot_bgcolor="#f1faee", paper_bgcolor="#f1faee",
+                      font_family="Inter", xaxis_title=None, yaxis_title=None, yaxis_visible=False)
+    return fig
+
+
+def _comparison_card(role_label: str, total: float, avg_dynamic, sample_n):
+    use_dynamic = (
+        isinstance(avg_dynamic, (int, float)) and avg_dynamic > 0 and (sample_n or 0) >= MIN_SAMPLES
+    )
+
+    # Use this variable everywhere below
+    avg_used = avg_dynamic if use_dynamic else AVERAGE_CO2_BY_ROLE.get(role_label)
+
+    msg, comp_color = None, "#6EA8FE"
+    if isinstance(avg_used, (int, float)) and avg_used > 0:
+        diff_pct = ((total - avg_used) / avg_used) * 100
+        abs_pct = abs(diff_pct)
+        if abs_pct < 1:
+            msg = f"You're roughly in line with the average {role_label.lower()}."
+            comp_color = "#6EA8FE"
+        elif diff_pct > 0:
+            msg = f"You emit {abs_pct:.0f}% more than the average {role_label.lower()}."
+            comp_color = "#e63946"
+        else:
+            msg = f"You emit {abs_pct:.0f}% less than the average {role_label.lower()}."
+            comp_color = "#2b8a3e"
+
+    if msg:
+        html(
+            f"<div style='{CARD_STYLE} {CARD_ACCENT}'>"
+            f"<div style='font-size:1.3rem; font-weight:800; color:#1b4332; margin:0;'>Your footprint vs average</div>"
+            f"<div style='font-size:2rem; font-weight:800; color:{comp_color}; line-height:1.15; margin:0;'>{msg}</div>"
+            f"<div style='font-size:1.05rem; color:#1b4332; margin:0;'>Average {role_label.lower()} emissions: <b>{avg_used:.0f} kg/year</b></div>"
+            f"</div>"
+        )
+    else:
+        html(f"<div style='{CARD_STYLE} {CARD_ACCENT}'>No average available for your role.</div>")
+
+
+def show_results_cards():
+    scroll_top()
+    # header
+    html("""
+        <div style="background: linear-gradient(to right, #d8f3dc, #a8dadc); padding: 40px 20px; border-radius: 12px; text-align: center; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 30px;">
+            <h1 style="font-size: 2.8em; margin-bottom: 0.1em;">Your Digital Carbon Footprint🌍</h1>
+            <p style="font-size: 1.2em; color: #1b4332;">Discover your impact — and what to do about it.</p>
+        </div>
+    """)
+
+    role_label = st.session_state.get("role", "")
+
+    # bundle calcolato in background dal Next del questionario (di solito già
+    # pronto dopo la pagina dell'archetipo). La media dei pari arriva dopo
+    peer_deadline = time.monotonic() + PEER_BUDGET_S
+    bundle = prefetch.bundle()
+    res, total, actual_top = bundle.results, bundle.total, bundle.top_category
+    key_to_category = {a["key"]: a["category"] for a in ARCHETYPES}
+    category_to_arc = {a["category"]: a for a in ARCHETYPES}
+    guessed_key = st.session_state.get("archetype_guess")
+    guessed = next((a for a in ARCHETYPES if a["key"] == guessed_key), None)
+    actual = category_to_arc.get(actual_top)
+    guessed_right = bool(guessed) and (key_to_category.get(guessed["key"]) == actual_top)
+
+    c1, c2, c3 = st.columns(3)
+
+    # Card 1 — Total
+    with c1:
+        card = st.container(border=True)
+        with card:
+            html(
+                f"<div style='{CARD_STYLE} {CARD_ACCENT}'>"
+                f"<div style='font-size:2rem; color:#1b4332; font-weight:800; margin:0;'>{st.session_state.get('name','')}, your total CO₂e is…</div>"
+                f"<div style='font-size:clamp(2.6rem,6vw,3.6rem); line-height:1; font-weight:900; color:#ff7f0e; letter-spacing:-0.5px; margin:0;'>{total:.0f} kg/year</div>"
+                f"</div>"
+            )
+    mark("results_cards.first_card")
+
+    # Card 2 — Comparison: segnaposto, riempito alla fine della pagina
+    with c2:
+        comparison = st.container(border=True).empty()
+        with comparison:
+            html(f"<div style='{CARD_STYLE} {CARD_ACCENT} color:#1b4332;'>Comparing with other {role_label.lower()}s…</div>")
+
+    # Card 3 — Archetype
+    if actual is None and actual_top in category_to_arc:
+        actual = category_to_arc[actual_top]
+    show_arc = guessed if (guessed_right and guessed) else (actual or {})
+    arc_name = show_arc.get("name", "")
+    arc_img = show_arc.get("image")
+    title = "Great job, you guessed it! Your match is" if guessed_right else "Nice try, but your match is"
+
+    with c3:
+        card = st.container(border=True)
+        with card:
+            left, right = st.columns([5, 3])
+            H = 220
+            with left:
+                html(
+                    f"""
+                    <div style="display:flex; flex-direction:column; justify-content:center; align-items:flex-start;
+                                min-height:{H}px; text-align:left; gap:.45rem; {CARD_ACCENT}">
+                        <div style="font-size:1.2rem; font-weight:800; color:#1b4332; margin:0;">{title}</div>
+                        <div style="font-weight:800; font-size:2rem; line-height:1.1; color:#ff7f0e; margin:0;">{arc_name}</div>
+                        <div style="font-size:1.05rem; color:#1b4332; margin:0;">Your biggest footprint comes from <b>{actual_top}</b></div>
+                    </div>
+                    """
+                )
+            with right:
+                html("<div style='display:flex; align-items:flex-start; justify-content:flex-end; padding-top:4px;'>")
+                if arc_img:
+                    show_image(arc_img, 180, "results_cards")
+                html("</div>")
+
+    # Peer distribution (percentile + istogramma dagli aggregati incrementali)
+    peer_n = role_aggregates().summary(role_label, "CO2 Total")["count"]
+    if peer_n >= MIN_SAMPLES:
+        html(f"<h4 style='margin-top:24px;'>How you compare with other {role_label.lower()}s</h4>")
+        peer_values = {"Total": total, **res}
+        peer_cols = st.columns(len(PEER_CATEGORIES))
+        for col, (label, agg_cat) in zip(peer_cols, PEER_CATEGORIES.items()):
+            value = float(peer_values.get(label, 0) or 0)
+            pct, _ = role_aggregates().percentile(role_label, agg_cat, value)
+            edges, counts = role_aggregates().histogram(role_label, agg_cat)
+            with col:
+                html(
+                    f"<div style='text-align:center; font-size:.95rem; color:#1b4332;'><b>{label}</b><br/>"
+                    f"{_ordinal(round(pct))} percentile</div>"
+                )
+                if counts:
+                    st.plotly_chart(_peer_chart(edges, counts, value), use_container_width=True,
+                                    config={"displayModeBar": False}, key=f"peer_{label}")
+        html(
+            f"<p style='font-size:0.85rem; color:gray;'>Based on {peer_n} {role_label.lower()} responses. "
+            "A higher percentile means higher emissions than your peers.</p>"
+        )
+
+    # Nav
+    st.markdown("### ")
+    left, _, right = st.columns([1, 4, 1])
+    with left:
+        st.button("⬅️ Back", key="res_cards_back", use_container_width=True, on_click=go_to, args=("guess",))
+    with right:
+        st.button("Next ➡️", key="res_cards_next", use_container_width=True, on_click=go_to, args=("results_breakdown",))
+
+    # Card 2: media dei pari se il lookup finisce entro il budget, altrimenti quella statica.
+    # Il job continua in background e un rerun della pagina lo trova pronto.
+    peer = prefetch.peer(timeout=max(0.0, peer_deadline - time.monotonic()))
+    if peer is None:
+        avg_dynamic, sample_n = None, None
+        mark("results_cards.peer_timeout")
+    else:
+        avg_dynamic, sample_n = peer
+    with comparison.container():
+        _comparison_card(role_label, total, avg_dynamic, sample_n)
+    mark("results_cards.comparison")
@@ -0,0 +1,80 @@
+import streamlit as st
+
+from services import save_row
+from views import prefetch
+from views.common import go_to, html, scroll_top
+
+
+def show_results_equiv():
+    scroll_top()
+
+    # header
+    html("""
+        <div style="background: linear-gradient(to right, #d8f3dc, #a8dadc); padding: 28px 16px; border-radius: 12px; text-align: center; margin-bottom: 16px;">
+            <h2 style="margin:0;">The same amount of emissions corresponds to...</h2>
+        </div>
+    """)
+
+    eq = prefetch.bundle().equivalences
+
+    html(f"""
+
+        <div class="equiv-grid">
+            <div class="equiv-card">
+                <div class="equiv-emoji">🍔</div>
+                <div class="equiv-text">Eating <span class="equiv-value">~{eq['burgers']:.0f}</span> beef burgers</div>
+            </div>
+            <div class="equiv-card">
+                <div class="equiv-emoji">💡</div>
+                <div class="equiv-text">Keeping 100 LED bulbs (10W) on for <span class="equiv-value">~{eq['led_days']:.0f}</span> days</div>
+            </div>
+            <div class="equiv-card">
+                <div class="equiv-emoji">🚗</div>
+                <div class="equiv-text">Driving a gasoline car for <span class="equiv-value">~{eq['car_km']:.0f}</span> km</div>
+            </div>
+            <div class="equiv-card">
+                <div class="equiv-emoji">📺</div>
+                <div class="equiv-text">Watching Netflix for <span class="equiv-value">~{eq['netflix_hours']:.0f}</span> hours</div>
+            </div>
+        </div>
+    """)
+
+    html("""
+    <div style="text-align: center; padding: 40px 10px;">
+        <h2 style="color: #1d3557;">Visit the next page to discover useful tips for reducing your footprint!💥</h2>
+    </div>
+    """)
+
+    # Nav + autosave
+    st.markdown("### ")
+    left, _, right = st.columns([1, 4, 1])
+    with left:
+        st.button("⬅️ Back", key="res_eq_back", use_container_width=True, on_click=go_to, args=("results_breakdown",))
+    with right:
+        st.button("➡️ Discover Tips", key="res_eq_next", use_container_width=True, on_click=_save_and_continue)
+
+
+def _save_and_continue():
+    try:
+        import sys
+
+        role_label = st.session_state.get("role", "")
+        bundle = prefetch.bundle()
+        queued = save_row(
+            st.session_state.submission_id,
+            role_label,
+            bundle.results.get("Devices", 0),
+            bundle.results.get("E-Waste", 0),
+            bundle.results.get("AI Tools", 0),
+            bundle.results.get("Digital Activities", 0),
+            float(bundle.total),
+            answers=st.session_state.get("answers_code"),
+            factor_version=st.session_state.get("factor_version"),
+        )
+        print("[autosave] queued:", queued, file=sys.stderr)
+    except Exception as e:
+        import traceback, sys
+        print("[autosave][ERROR]", e, file=sys.stderr)
+        traceback.print_exc()
+
+    st.session_state.page = "virtues"
@@ -0,0 +1,67 @@
+import streamlit as st
+
+from views import prefetch
+from views.common import go_to, html, scroll_top
+
+
+def show_virtues():
+    scroll_top()
+
+    name = (st.session_state.get("name") or "").strip()
+    html(f"""
+        <div style="background: linear-gradient(to right, #d8f3dc, #a8dadc);
+                    padding: 28px 16px; border-radius: 12px; margin-bottom: 16px; text-align:center;">
+            <h2 style="margin:0; color:#1d3557; font-size:2.2rem; line-height:1.2;">
+                {name}, here are some practical tips to shrink your digital footprint!
+            </h2>
+            <p style="margin:8px 0 0; color:#1b4332; font-size:1.05rem;">
+                We’ll start with actions tailored to your highest-impact area, followed by general tips you can apply every day.
+            </p>
+        </div>
+    """)
+    
+    # Consigli e virtù arrivano già pronti dal bundle dei risultati
+    b = prefetch.bundle()
+    if b:
+        with st.expander(f"📌 Tips for top impact area: {b.top_category}", expanded=True):
+            for tip in b.top_tips:
+                html(
+                    f"<div style='background:#e3fced; padding:15px; border-radius:10px; margin-bottom:10px;'>{tip}</div>"
+                )
+
+        for cat, picked in b.other_tips:
+            with st.expander(f"📌 More to improve in {cat}", expanded=False):
+                for tip in picked:
+                    html(
+                        f"<div style='background:#e3fced; padding:15px; border-radius:10px; margin-bottom:10px;'>{tip}</div>"
+                    )
+
+    html("""
+        <div style="background-color:#fefae0; border-left: 6px solid #e09f3e; 
+                    padding: 14px; border-radius: 8px; margin-top: 18px;">
+            <h4 style="margin-top:0;">Next step...</h4>
+            <p style="margin:0; font-size: 15px; line-height: 1.5;">
+                Try applying some or all of these tips, then come back in 6 months and recalculate your footprint. 
+                You’ll see how much you’ve improved!
+            </p>
+        </div>
+    """)
+
+    virtues = b.virtues if b else []
+
+    if virtues:
+        st.markdown("#### You’re already making smart choices")
+        html(
+            "<p style='margin-top:-4px; font-size:0.95rem; color:#1b4332;'>Here are a few great habits we noticed from your answers.</p>"
+        )
+        for v in virtues:
+            html(f'<div class="virtue-card">{v}</div>')
+
+    # Pulsante per passare ai risultati
+    st.markdown("### ")
+
+    left, _, right = st.columns([1, 4, 1])
+    with left:
+        st.button("⬅️ Back", key="virt_back_btn", use_container_width=True, on_click=go_to, args=("results_equiv",))
+    with right:
+        st.button("Finish ➡️", key="virt_finish_btn", use_container_width=True, on_click=go_to, args=("final",))
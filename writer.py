@@ -0,0 +1,243 @@
+"""
+Coda write-behind per il salvataggio dei risultati.
+
+`submit()` non tocca mai il backend: scrive la riga in un file di spool
+append-only (sopravvive a crash e riavvii) e ritorna subito. Un thread in
+background la invia insieme alle altre con una sola `append_rows()` ogni
+`batch_size` righe o `flush_interval` secondi, con retry e backoff esponenziale.
+Dopo ogni batch scritto viene chiamato `on_written(rows)`, se presente.
+
+Deduplicazione: una chiave è rifiutata se è in coda o tra le ultime
+`dedup_window` confermate. Le chiavi confermate restano nello spool anche
+dopo la compattazione, quindi la finestra sopravvive ai riavvii; oltre la
+finestra una chiave molto vecchia verrebbe accettata di nuovo.
+
+Formato dello spool (JSON lines):
+  {"op": "row", "key": "<idempotency key>", "row": {...}}
+  {"op": "ack", "keys": ["...", ...]}
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class WriteBehindQueue:
+    def __init__(self, append_rows, spool_path: str, columns: list[str],
+                 batch_size: int = 20, flush_interval: float = 5.0,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0, on_written=None,
+                 dedup_window: int = 10000):
+        self._append_rows = append_rows
+        self._on_written = on_written
+        self.spool_path = spool_path
+        self.columns = columns
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.dedup_window = dedup_window
+
+        # ordine dei lock: _spool_lock poi _cond; l'fsync non avviene mai sotto _cond
+        self._spool_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._pending = []          # [(key, row, enqueued_at)]
+        self._queued = set()        # chiavi accettate e non ancora confermate
+        self._acked = OrderedDict() # ultime `dedup_window` chiavi confermate
+        self._thread = None
+        self._stopping = False
+        self._flush_waiters = 0
+
+        self.written = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_error = None
+
+        self._replay_spool()
+
+    # --- spool
+
+    def _replay_spool(self):
+        if not os.path.exists(self.spool_path):
+            return
+        rows = {}
+        with open(self.spool_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # ultima riga troncata da un crash
+                if rec.get("op") == "row":
+                    rows.setdefault(rec["key"], rec["row"])
+                elif rec.get("op") == "ack":
+                    self._remember_acked(rec["keys"])
+        now = time.monotonic()
+        self._pending = [(k, r, now) for k, r in rows.items() if k not in self._acked]
+        self._queued = {k for k, _, _ in self._pending}
+        self._rewrite_spool()
+
+    def _remember_acked(self, keys):
+        for key in keys:
+            self._acked[key] = None
+            self._acked.move_to_end(key)
+        while len(self._acked) > self.dedup_window:
+            self._acked.popitem(last=False)
+
+    def _rewrite_spool(self):
+        # compatta: restano la finestra di chiavi confermate e le righe non ancora confermate
+        tmp = self.spool_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            if self._acked:
+                f.write(json.dumps({"op": "ack", "keys": list(self._acked)}) + "\n")
+            for key, row, _ in self._pending:
+                f.write(json.dumps({"op": "row", "key": key, "row": row}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.spool_path)
+
+    def _append_spool(self, rec: dict):
+        with open(self.spool_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    # --- API
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+        return self
+
+    def submit(self, key: str, row: dict) -> bool:
+        """Accoda la riga. Ritorna False se la chiave è già stata accettata."""
+        with self._spool_lock:
+            with self._cond:
+                if key in self._queued or key in self._acked:
+                    self.duplicates += 1
+                    return False
+                self._queued.add(key)
+            # scrittura durevole fuori da _cond: worker e stats non aspettano l'fsync
+            try:
+                self._append_spool({"op": "row", "key": key, "row": row})
+            except Exception:
+                with self._cond:
+                    self._queued.discard(key)
+                raise
+            with self._cond:
+                self._pending.append((key, row, time.monotonic()))
+                if len(self._pending) >= self.batch_size:
+                    self._cond.notify()
+        return True
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Forza l'invio di tutto ciò che è in coda; True se la coda si è svuotata."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flush_waiters += 1
+            self._cond.notify()
+            try:
+                while self._pending and time.monotonic() < deadline:
+                    self._cond.wait(0.05)
+            finally:
+                self._flush_waiters -= 1
+            return not self._pending
+
+    def stop(self, timeout: float = 30.0):
+        """Svuota la coda e attende la fine del worker: dopo stop() lo spool non è più in uso."""
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "written": self.written,
+                "batches": self.batches,
+                "duplicates": self.duplicates,
+                "dedup_keys": len(self._acked),
+                "failures": self.failures,
+                "last_error": self.last_error,
+            }
+
+    # --- worker
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._stopping:
+                if self._pending:
+                    oldest = self._pending[0][2]
+                    due = oldest + self.flush_interval
+                    if self._flush_waiters or len(self._pending) >= self.batch_size or time.monotonic() >= due:
+                        return self._pending[:self.batch_size]
+                    self._cond.wait(max(0.0, due - time.monotonic()))
+                else:
+                    self._cond.wait()
+            return None
+
+    def _run(self):
+        attempt = 0
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                attempt = self._send(batch, attempt)
+            except Exception as e:
+                # il thread non deve morire: la riga resta in coda e si riprova
+                print(f"[writer] batch of {len(batch)} failed: {e!r}", file=sys.stderr)
+                with self._cond:
+                    self.last_error = repr(e)
+                time.sleep(self.backoff_base)
+
+    def _send(self, batch, attempt: int) -> int:
+        """Invia un batch; ritorna il nuovo numero di tentativi falliti di fila."""
+        values = [[row.get(c, "") for c in self.columns] for _, row, _ in batch]
+        try:
+            self._append_rows(values)
+        except Exception as e:
+            attempt += 1
+            with self._cond:
+                self.failures += 1
+                self.last_error = repr(e)
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+            time.sleep(delay * random.uniform(0.5, 1.0))
+            return attempt
+
+        keys = [k for k, _, _ in batch]
+        with self._spool_lock:
+            try:
+                self._append_spool({"op": "ack", "keys": keys})
+            except Exception as e:
+                # righe già nel backend: si tolgono comunque dalla coda per non reinviarle
+                print(f"[writer] cannot record ack in spool: {e!r}", file=sys.stderr)
+            with self._cond:
+                done = set(keys)
+                self._pending = [p for p in self._pending if p[0] not in done]
+                self._queued -= done
+                self._remember_acked(keys)
+                self.written += len(batch)
+                self.batches += 1
+                compact = not self._pending
+                self._cond.notify_all()
+            if compact:
+                # nessun submit può inserirsi: tiene _spool_lock
+                try:
+                    self._rewrite_spool()
+                except Exception as e:
+                    print(f"[writer] spool compaction failed: {e!r}", file=sys.stderr)
+
+        if self._on_written is not None:
+            try:
+                self._on_written([row for _, row, _ in batch])
+            except Exception:
+                pass  # gli aggregati non devono mai fermare la scrittura
+        return 0